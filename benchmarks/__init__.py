@@ -0,0 +1,8 @@
+"""Benchmarks of sudokutools.
+
+Run all benchmarks from the root of the repository with::
+
+    python -m benchmarks -o results.json
+
+See benchmarks.__main__ for the available options.
+"""
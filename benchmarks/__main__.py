@@ -0,0 +1,210 @@
+"""Run the benchmarks and report timings and peak memory as JSON.
+
+Usage (from the root of the repository)::
+
+    python -m benchmarks                       # all benchmarks to stdout
+    python -m benchmarks -o new.json           # write results to new.json
+    python -m benchmarks -k dlx -k decode      # only matching benchmarks
+    python -m benchmarks --compare old.json    # also compare to old results
+
+Each benchmark runs an operation on every sudoku of a corpus (see
+corpora/). The corpora are fixed and generating sudokus uses a fixed
+random seed, so results of different commits can be compared.
+
+For each benchmark the JSON output holds:
+
+ * count: The number of operations in a run.
+ * min, mean: The minimum and mean time of a run in seconds.
+ * per_op: The minimum time of a single operation in seconds.
+ * peak_memory: The peak of memory allocated during a run in bytes
+   (measured by tracemalloc in a separate run).
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+import sudokutools
+from sudokutools.analyze import is_unique, rate, score
+from sudokutools.cache import get_cache, set_cache
+from sudokutools.generate import SYMMETRY, generate
+from sudokutools.solve import bruteforce, dlx
+from sudokutools.solvers import solve
+from sudokutools.sudoku import Sudoku
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "corpora")
+
+# corpus name: (file name, number_sep)
+CORPORA = {
+    "easy": ("easy.txt", None),
+    "hard": ("hard.txt", None),
+    "16x16": ("16x16.txt", " "),
+}
+
+SEED = 4711
+GENERATE_COUNT = 5
+ROUNDS = 100
+
+
+def load_corpus(name):
+    """Return the lines and the sudokus of the corpus name."""
+    filename, number_sep = CORPORA[name]
+    with open(os.path.join(CORPORA_DIR, filename)) as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    sudokus = [Sudoku.decode(line, number_sep=number_sep) for line in lines]
+    return lines, sudokus
+
+
+def benchmarks():
+    """Yield (name, count, func) of all benchmarks.
+
+    func() runs the operation count times.
+    """
+    for name in sorted(CORPORA):
+        lines, sudokus = load_corpus(name)
+        sep = CORPORA[name][1] or ""
+
+        # parsing and printing are fast, so they run for ROUNDS rounds
+        ops = [
+            ("sudoku.decode", ROUNDS, partial(
+                _each, lambda line: Sudoku.decode(line, number_sep=sep or None),
+                lines * ROUNDS)),
+            ("sudoku.encode", ROUNDS, partial(
+                _each, lambda sudoku: sudoku.encode(row_sep=sep, col_sep=sep),
+                sudokus * ROUNDS)),
+            ("solve.dlx", 1, partial(
+                _each, lambda sudoku: next(dlx(sudoku)), sudokus)),
+            ("solvers.solve", 1, partial(
+                _each, lambda sudoku: solve(sudoku, _ignore), sudokus)),
+            ("analyze.is_unique", 1, partial(_each, is_unique, sudokus)),
+        ]
+
+        # too slow for 16x16 sudokus
+        if name != "16x16":
+            ops.extend([
+                ("solve.bruteforce", 1, partial(
+                    _each, lambda sudoku: next(bruteforce(sudoku)), sudokus)),
+                ("analyze.rate", 1, partial(_each, rate, sudokus)),
+                ("analyze.score", 1, partial(_each, score, sudokus)),
+            ])
+
+        for op, rounds, func in ops:
+            yield "%s/%s" % (op, name), rounds * len(sudokus), func
+
+    for symmetry in sorted(SYMMETRY, key=str):
+        yield ("generate.generate/%s" % symmetry, GENERATE_COUNT,
+               partial(_generate, symmetry))
+
+
+def _each(func, items):
+    for item in items:
+        func(item)
+
+
+def _ignore(step):
+    pass
+
+
+def _generate(symmetry):
+    random.seed(SEED)
+    for _ in range(GENERATE_COUNT):
+        generate(symmetry=symmetry)
+
+
+def measure(count, func, repeat):
+    """Run func repeat times and return the results of a benchmark."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "count": count,
+        "min": min(times),
+        "mean": sum(times) / len(times),
+        "per_op": min(times) / count,
+        "peak_memory": peak,
+    }
+
+
+def compare(results, old, outfile):
+    """Write the change of the time per operation to outfile."""
+    print("%-40s %12s %12s %8s" % ("benchmark", "old (s/op)", "new (s/op)",
+                                     "new/old"), file=outfile)
+    for name, result in sorted(results.items()):
+        if name not in old:
+            continue
+        before, after = old[name]["per_op"], result["per_op"]
+        print("%-40s %12.3g %12.3g %8.2f" % (
+            name, before, after, after / before if before else 0.0),
+            file=outfile)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the sudokutools benchmarks.")
+    parser.add_argument(
+        "-o", dest="outfile", type=argparse.FileType("w"), default="-",
+        help="The file to write the JSON results to (default: stdout).")
+    parser.add_argument(
+        "-k", dest="patterns", action="append", default=[],
+        help="Only run benchmarks, which contain PATTERNS in their name " +
+             "(may be given multiple times).")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="The number of timed runs of each benchmark (default: 3).")
+    parser.add_argument(
+        "--compare", type=argparse.FileType("r"),
+        help="JSON results of an earlier run to compare with " +
+             "(written to stderr).")
+    arguments = parser.parse_args(args)
+
+    previous_cache = get_cache()
+    set_cache(None)
+
+    results = {}
+    try:
+        for name, count, func in benchmarks():
+            if arguments.patterns and not any(
+                    pattern in name for pattern in arguments.patterns):
+                continue
+            print("Running %s ..." % name, file=sys.stderr)
+            results[name] = measure(count, func, arguments.repeat)
+    finally:
+        set_cache(previous_cache)
+
+    json.dump({
+        "python": platform.python_version(),
+        "sudokutools": sudokutools.__version__,
+        "repeat": arguments.repeat,
+        "benchmarks": results,
+    }, arguments.outfile, indent=2, sort_keys=True)
+    arguments.outfile.write("\n")
+    arguments.outfile.flush()
+
+    if arguments.compare:
+        compare(results, json.load(arguments.compare)["benchmarks"],
+                sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
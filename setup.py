@@ -14,6 +14,9 @@ setup(
             'sudokutools = sudokutools.__main__:main',
         ],
     },
+    extras_require={
+        'numpy': ['numpy'],
+    },
     version = version,
     description = description,
     long_description=long_description,
@@ -7,11 +7,16 @@ For a short introduction see: https://github.com/messersm/sudokutools
 
 Package modules:
  * sudokutools.analyze: Check, rate and analyze sudokus.
+ * sudokutools.batch: Process many sudokus at once.
+ * sudokutools.cache: Cache results of solving and analyzing sudokus.
+ * sudokutools.corpus: Store many sudokus in a compact binary file.
  * sudokutools.dlx: Internal module - do not use.
  * sudokutools.generate: Create new sudokus.
  * sudokutools.solve: Low-level solving of sudokus.
  * sudokutools.solvers: High level solving of sudokus.
  * sudokutools.sudoku: Parse, print and compare sudokus.
+ * sudokutools.vectorized: Process many sudokus at once using NumPy
+   (requires NumPy).
 """
 
 __author__ = "Maik Messerschmidt"
@@ -2,13 +2,23 @@ from __future__ import print_function
 
 import argparse
 import sys
+import time
 
+from sudokutools.batch import rate_lines, solve_lines
 from sudokutools.shell import Shell
+from sudokutools.solve import DLX_ENGINES
 
 
 def main():
     """Run the sudokutools shell."""
 
+    if sys.argv[1:2] == ["solve-batch"]:
+        solve_batch(sys.argv[2:])
+        return
+    elif sys.argv[1:2] == ["rate-batch"]:
+        rate_batch(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description=main.__doc__)
     parser.add_argument(
         "filename", nargs="?",
@@ -17,6 +27,9 @@ def main():
         "-c", dest="command",
         help="Execute COMMAND instead of starting an interactive shell. " +
              "(Ignored, if filename is given.)")
+    parser.epilog = (
+        "Use 'sudokutools solve-batch -h' and 'sudokutools rate-batch -h' "
+        "for help on solving and rating files of sudokus.")
 
     arguments = parser.parse_args()
 
@@ -36,5 +49,79 @@ def main():
         Shell().run()
 
 
+def solve_batch(args):
+    """Solve a file of sudokus (one encoded sudoku per line)."""
+
+    parser = argparse.ArgumentParser(
+        prog="sudokutools solve-batch", description=solve_batch.__doc__)
+    add_batch_arguments(parser)
+    parser.add_argument(
+        "--engine", choices=sorted(DLX_ENGINES), default="sets",
+        help="The exact cover engine to use (default: sets).")
+
+    arguments = parser.parse_args(args)
+    run_batch(arguments, solve_lines(
+        arguments.infile, engine=arguments.engine,
+        box_size=arguments.box_size, workers=arguments.workers or None),
+        "Solved")
+
+
+def rate_batch(args):
+    """Rate a file of sudokus (one encoded sudoku per line).
+
+    For each sudoku a line with a JSON object containing the rating,
+    score and the number of solve steps of each kind is written.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="sudokutools rate-batch", description=rate_batch.__doc__)
+    add_batch_arguments(parser)
+
+    arguments = parser.parse_args(args)
+    run_batch(arguments, rate_lines(
+        arguments.infile, box_size=arguments.box_size,
+        workers=arguments.workers or None), "Rated")
+
+
+def add_batch_arguments(parser):
+    """Add the arguments shared by all batch modes to parser."""
+    parser.add_argument(
+        "infile", type=argparse.FileType("r"),
+        help="The file to read sudokus from ('-' reads from stdin).")
+    parser.add_argument(
+        "-o", dest="outfile", type=argparse.FileType("w"), default="-",
+        help="The file to write to (default: stdout).")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="The number of worker processes (default: 1, 0 uses " +
+             "one process per CPU).")
+    parser.add_argument(
+        "--box-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"),
+        dest="box_size",
+        help="The box size of the sudokus (default: guessed from " +
+             "the number of fields).")
+
+
+def run_batch(arguments, results, verb):
+    """Write results to arguments.outfile and report the throughput."""
+    start = time.time()
+    count = 0
+
+    try:
+        for line in results:
+            arguments.outfile.write(line + "\n")
+            count += 1
+    except (IOError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        arguments.outfile.flush()
+
+    seconds = time.time() - start
+    print("%s %d sudokus in %.2f s (%.1f per second)." % (
+        verb, count, seconds, count / seconds if seconds else 0.0),
+        file=sys.stderr)
+
+
 if __name__ == '__main__':
     main()
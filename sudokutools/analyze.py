@@ -7,9 +7,15 @@ Functions defined here:
  * rate(): Return an integer representation of the difficulty of a sudoku.
  * score(): Return an integer representation of the work required to solve
             a sudoku.
+ * statistics(): Return rating, score and the used solve steps of a sudoku.
+ * canonical(): Return the canonical form of a sudoku and a hash of it.
 """
 
-from sudokutools.solve import dlx
+from hashlib import sha1
+from itertools import permutations
+
+from sudokutools.cache import get_cache, puzzle_key
+from sudokutools.solve import count_solutions
 from sudokutools.solvers import CalculateCandidates, \
     NakedSingle, NakedPair, NakedTriple, NakedQuad, NakedQuint, \
     HiddenSingle, HiddenPair, HiddenTriple, HiddenQuad, HiddenQuint, \
@@ -40,11 +46,19 @@ RATINGS = {
 }
 
 
-def rate(sudoku):
+def rate(sudoku, profile=None, solvers=None, budget=None):
     """Rate the difficulty of a sudoku and return 0 <= rating <= 10.
 
     Args:
         sudoku (Sudoku): The sudoku to rate.
+        profile (Profile): Collect the work done by each solve method
+                           in this profile (see solvers.Profile).
+        solvers (list of SolveStep subclasses): The solve methods to use
+                                                (see solvers.solve()).
+        budget (Budget): Stop solving, when this budget is used up
+                         (see solvers.Budget). If budget.exceeded is
+                         True afterwards, the result only covers the
+                         steps taken so far.
 
     Returns:
         (int): The rating (a value inclusive between 0 and 10).
@@ -52,16 +66,10 @@ def rate(sudoku):
     Note:
         Only completely solved sudokus get a rating of 0.
     """
-    steps = []
-    solve(sudoku, steps.append)
-    # max() raises a ValueError, if the list is empty.
-    try:
-        return max([RATINGS[step.__class__] for step in steps])
-    except ValueError:
-        return 0
+    return _rate_and_score(sudoku, profile, solvers, budget)[0]
 
 
-def score(sudoku):
+def score(sudoku, profile=None, solvers=None, budget=None):
     """Return a score for the given sudoku.
 
     The score depends on the number of empty field as well as
@@ -69,14 +77,260 @@ def score(sudoku):
 
     Args:
         sudoku (Sudoku): The sudoku to score.
+        profile (Profile): Collect the work done by each solve method
+                           in this profile (see solvers.Profile).
+        solvers (list of SolveStep subclasses): The solve methods to use
+                                                (see solvers.solve()).
+        budget (Budget): Stop solving, when this budget is used up
+                         (see solvers.Budget). If budget.exceeded is
+                         True afterwards, the result only covers the
+                         steps taken so far.
 
     Returns:
         (int): The score (a value between 0 and empty * 10,
                where empty is the number of empty fields in the sudoku).
     """
-    steps = []
-    solve(sudoku, steps.append)
-    return sum([RATINGS[step.__class__] for step in steps])
+    return _rate_and_score(sudoku, profile, solvers, budget)[1]
+
+
+def _rate_and_score(sudoku, profile, solvers, budget):
+    """Return rating and score of the sudoku for rate() and score().
+
+    If a cache is set (see cache.set_cache()) and profile, solvers and
+    budget are None, the results are looked up in and stored in the cache.
+    They are stored for the exact sudoku (see cache.puzzle_key()), since
+    the score of equivalent sudokus (see canonical()) may differ.
+
+    This is an internal function and should not be used
+    outside of the analyze module.
+    """
+    cache = get_cache()
+    custom = profile is not None or solvers is not None or budget is not None
+    if cache is None or custom:
+        return statistics(sudoku, profile, solvers, budget)[:2]
+
+    key = puzzle_key(sudoku)
+    record = cache.get(key)
+    if record is not None and "rating" in record:
+        return record["rating"], record["score"]
+
+    rating, total, counts = statistics(sudoku)
+    cache.update(key, rating=rating, score=total)
+    return rating, total
+
+
+def statistics(sudoku, profile=None, solvers=None, budget=None):
+    """Return the rating, score and the number of steps of each kind.
+
+    This solves the sudoku only once, while rate() and score()
+    each solve the sudoku (unless a cache is set).
+
+    If a cache is set (see cache.set_cache()), the solve steps are looked
+    up in and stored in the cache by solvers.solve().
+
+    Args:
+        sudoku (Sudoku): The sudoku to analyze.
+        profile (Profile): Collect the work done by each solve method
+                           in this profile (see solvers.Profile).
+        solvers (list of SolveStep subclasses): The solve methods to use
+                                                (see solvers.solve()).
+        budget (Budget): Stop solving, when this budget is used up
+                         (see solvers.Budget). If budget.exceeded is
+                         True afterwards, the result only covers the
+                         steps taken so far.
+
+    Returns:
+        (int, int, dict): The rating (see rate()), the score (see score())
+                          and a dict, which maps the names of the used
+                          solve step classes to the number of steps.
+    """
+    counts = {}
+
+    def report(step):
+        name = step.__class__.__name__
+        counts[name] = counts.get(name, 0) + 1
+
+    solve(sudoku, report, profile=profile, solvers=solvers, budget=budget)
+
+    ratings = dict((cls.__name__, r) for cls, r in RATINGS.items())
+    rating = max([ratings[name] for name in counts] or [0])
+    total = sum([ratings[name] * count for name, count in counts.items()])
+    return rating, total, counts
+
+
+def canonical(sudoku):
+    """Return the canonical form of a sudoku and a stable hash of it.
+
+    Two sudokus are equivalent, if one can be transformed into the other
+    by relabeling the numbers, swapping rows within a band, columns
+    within a stack, whole bands or stacks and (if the boxes are square)
+    transposing. The canonical form is the equivalent sudoku, which is
+    the smallest, when read row by row (with empty fields as 0), so
+    equivalent sudokus have the same canonical form and hash.
+
+    Sudokus with many equal ways to transform them (e.g. completely
+    filled sudokus) take much longer than typical puzzles.
+
+    Args:
+        sudoku (Sudoku): The sudoku to transform (candidates are ignored).
+
+    Returns:
+        (Sudoku, str): The canonical form and the hexadecimal SHA-1 hash of
+                       its box size and numbers, which is the same for all
+                       python versions and processes.
+    """
+    geo = sudoku.geometry
+    width, height = sudoku.box_width, sudoku.box_height
+    rows = [tuple(sudoku.get_at(i) for i in row) for row in geo.rows]
+    grids = [rows]
+    if width == height:
+        grids.append(list(zip(*rows)))
+
+    # Each state is one way to get the canonical form read so far:
+    # (grid, column cells, number -> label mapping, next label,
+    # used rows, current band). The columns within a cell haven't
+    # been ordered yet.
+    states = []
+    seen = set()
+    for grid in grids:
+        for stacks in permutations(range(height)):
+            cells = tuple(tuple(range(s * width, (s + 1) * width))
+                          for s in stacks)
+            key = tuple(
+                tuple(row[c] for cell in cells for c in cell) for row in grid)
+            if key not in seen:
+                seen.add(key)
+                states.append((grid, cells, {}, 1, frozenset(), None))
+
+    numbers = []
+    for i in geo.indices:
+        best = None
+        children = []
+        for grid, cells, mapping, label, used, band in states:
+            for r in _next_rows(grid, used, band, i % height == 0, height):
+                for values, new_cells, new_mapping, new_label in _refine(
+                        grid[r], cells, mapping, label):
+                    if best is None or values < best:
+                        best = values
+                        children = []
+                        seen = set()
+                    if values != best:
+                        continue
+
+                    new_used = used | frozenset((r,))
+                    key = (id(grid), new_cells, new_used,
+                           tuple(sorted(new_mapping.items())))
+                    if key not in seen:
+                        seen.add(key)
+                        children.append((grid, new_cells, new_mapping,
+                                         new_label, new_used, r // height))
+
+        numbers.extend(best)
+        states = children
+
+    result = sudoku.__class__(box_size=sudoku.box_size)
+    for i, value in enumerate(numbers):
+        result.set_at(i, value)
+
+    data = "%dx%d:%s" % (width, height, result.encode(col_sep=","))
+    return result, sha1(data.encode("ascii")).hexdigest()
+
+
+def _next_rows(grid, used, band, new_band, height):
+    """Yield the rows of grid, which may be the next row of canonical().
+
+    Rows (and bands) with equal numbers give the same result,
+    so only one of them is yielded.
+
+    This is an internal function and should not be used
+    outside of the analyze module.
+    """
+    if new_band:
+        bands = []
+        for start in range(0, len(grid), height):
+            rows = sorted(grid[start:start + height])
+            if start not in used and rows not in bands:
+                bands.append(rows)
+                for r in _unique_rows(grid, range(start, start + height)):
+                    yield r
+    else:
+        start = band * height
+        candidates = [r for r in range(start, start + height)
+                      if r not in used]
+        for r in _unique_rows(grid, candidates):
+            yield r
+
+
+def _unique_rows(grid, candidates):
+    """Yield the candidates (row numbers) with distinct numbers in grid.
+
+    This is an internal function and should not be used
+    outside of the analyze module.
+    """
+    found = set()
+    for r in candidates:
+        if grid[r] not in found:
+            found.add(grid[r])
+            yield r
+
+
+def _refine(row, cells, mapping, label):
+    """Return the ways to order the columns of cells for canonical().
+
+    The columns in each cell are split into new cells: empty fields,
+    numbers with a label (by label) and new numbers in each order.
+
+    Returns:
+        list of (tuple, tuple, dict, int): The relabeled row, the new
+                                           cells, the new mapping and
+                                           the next free label.
+
+    This is an internal function and should not be used
+    outside of the analyze module.
+    """
+    partials = [((), (), mapping, label)]
+
+    for cell in cells:
+        new_partials = []
+        for values, new_cells, mapping, label in partials:
+            zeros = []
+            known = {}
+            unknown = {}
+            for c in cell:
+                number = row[c]
+                if not number:
+                    zeros.append(c)
+                elif number in mapping:
+                    known.setdefault(mapping[number], []).append(c)
+                else:
+                    unknown.setdefault(number, []).append(c)
+
+            if zeros:
+                values += (0,) * len(zeros)
+                new_cells += (tuple(zeros),)
+            for known_label in sorted(known):
+                values += (known_label,) * len(known[known_label])
+                new_cells += (tuple(known[known_label]),)
+
+            if not unknown:
+                new_partials.append((values, new_cells, mapping, label))
+                continue
+
+            for order in permutations(sorted(unknown)):
+                new_mapping = dict(mapping)
+                new_values = values
+                split = new_cells
+                new_label = label
+                for number in order:
+                    new_mapping[number] = new_label
+                    new_values += (new_label,) * len(unknown[number])
+                    split += (tuple(unknown[number]),)
+                    new_label += 1
+                new_partials.append((new_values, split, new_mapping, new_label))
+
+        partials = new_partials
+
+    return partials
 
 
 def is_solved(sudoku):
@@ -99,22 +353,45 @@ def is_unique(sudoku):
 
     Returns:
         bool: Whether or not the sudoku is unique.
+
+    If a cache is set (see cache.set_cache()), the result is looked up
+    in and stored in the cache.
+    """
+    cache = get_cache()
+    if cache is None:
+        return count_solutions(sudoku, limit=2) == 1
+
+    key = _invariant_key(cache, sudoku)
+    record = cache.get(key)
+    if record is not None and "unique" in record:
+        return record["unique"]
+
+    unique = count_solutions(sudoku, limit=2) == 1
+    cache.update(key, unique=unique)
+    return unique
+
+
+def _invariant_key(cache, sudoku):
+    """Return the cache key of results, which are equal for equivalent sudokus.
+
+    This is the hash of the canonical form of the sudoku (see canonical()),
+    if cache.canonical is True and puzzle_key(sudoku) otherwise. The hash
+    of the canonical form is cached as well.
+
+    This is an internal function and should not be used
+    outside of the analyze module.
     """
-    solutions = dlx(sudoku)
+    key = puzzle_key(sudoku)
+    if not cache.canonical:
+        return key
 
-    # If we have no solutions return False.
-    try:
-        next(solutions)
-    except StopIteration:
-        return False
+    record = cache.get(key)
+    if record is not None and "canonical" in record:
+        return record["canonical"]
 
-    # If we have two (or more solutions return False
-    # otherwise return True.
-    try:
-        next(solutions)
-        return False
-    except StopIteration:
-        return True
+    digest = canonical(sudoku)[1]
+    cache.update(key, canonical=digest)
+    return digest
 
 
 def find_conflicts(sudoku, *coords):
@@ -133,13 +410,15 @@ def find_conflicts(sudoku, *coords):
         the fields (2, 3) and (2, 6) because both of them contain a 2.
     """
     if not coords:
-        coords = list(sudoku)
+        coords = sudoku
 
+    geo = sudoku.geometry
     for row, col in coords:
-        value = sudoku[row, col]
+        index = row * geo.size + col
+        value = sudoku.get_at(index)
         if not value:
             continue
         else:
-            for (i, j) in sudoku.surrounding_of(row, col, include=False):
-                if sudoku[i, j] == value:
-                    yield ((row, col), (i, j), value)
\ No newline at end of file
+            for i in geo.peers[index]:
+                if sudoku.get_at(i) == value:
+                    yield ((row, col), geo.coords[i], value)
\ No newline at end of file
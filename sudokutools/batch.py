@@ -0,0 +1,150 @@
+"""Process many sudokus at once.
+
+Functions defined here:
+ * solve_lines(): Solve encoded sudokus and yield the encoded solutions.
+ * rate_lines(): Rate encoded sudokus and yield the results as JSON.
+
+Sudokus are read and written as lines in the format of
+Sudoku.encode() and Sudoku.decode(), one sudoku per line.
+All functions stream their input: Only a few chunks of lines
+are held in memory at any time, also when using multiple processes.
+"""
+
+import json
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+
+from sudokutools.analyze import statistics
+from sudokutools.solve import DLX_ENGINES, dlx
+from sudokutools.sudoku import Sudoku
+
+
+def solve_lines(lines, engine="sets", box_size=None, workers=1,
+                chunksize=64):
+    """Solve the encoded sudokus and yield their encoded solutions.
+
+    Args:
+        lines (iterable of str): Encoded sudokus (one per line).
+        engine (str): The exact cover engine to use (see solve.dlx()).
+        box_size (int, int): The box size of the sudokus (see
+                             Sudoku.decode()).
+        workers (int): The number of worker processes. None uses one
+                       process per CPU, 1 solves in the current process.
+        chunksize (int): The number of lines handed to a worker at once.
+
+    Yields:
+        str: The encoded solution for each line (in the same order).
+             Empty lines are yielded for empty lines and for sudokus
+             without a solution.
+
+    Raises:
+        ValueError: if engine is not a valid engine name.
+    """
+    # raise errors here and not in the workers
+    if engine not in DLX_ENGINES:
+        values = ", ".join(sorted(DLX_ENGINES))
+        raise ValueError("engine must be one of %s" % values)
+
+    return _map_chunks(_solve_chunk, (engine, box_size), lines, workers,
+                      chunksize)
+
+
+def _solve_chunk(task):
+    """Solve a chunk of lines for solve_lines()."""
+    (engine, box_size), lines = task
+    solutions = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            solutions.append("")
+            continue
+
+        sudoku = Sudoku.decode(line, box_size=box_size)
+        solution = next(dlx(sudoku, engine=engine), None)
+        solutions.append(solution.encode() if solution else "")
+
+    return solutions
+
+
+def rate_lines(lines, box_size=None, workers=1, chunksize=16):
+    """Rate the encoded sudokus and yield the results as JSON.
+
+    Every sudoku is solved only once to get its rating, score and the
+    number of solve steps used of each kind (see analyze.statistics()).
+
+    Args:
+        lines (iterable of str): Encoded sudokus (one per line).
+        box_size (int, int): The box size of the sudokus (see
+                             Sudoku.decode()).
+        workers (int): The number of worker processes. None uses one
+                       process per CPU, 1 rates in the current process.
+        chunksize (int): The number of lines handed to a worker at once.
+
+    Yields:
+        str: A JSON object for each line (in the same order), e.g.:
+             {"rating": 2, "score": 62, "steps": {"NakedSingle": 42, ...}}
+             "null" is yielded for empty lines.
+    """
+    return _map_chunks(_rate_chunk, box_size, lines, workers, chunksize)
+
+
+def _rate_chunk(task):
+    """Rate a chunk of lines for rate_lines()."""
+    box_size, lines = task
+    results = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            results.append("null")
+            continue
+
+        rating, score, steps = statistics(
+            Sudoku.decode(line, box_size=box_size))
+        results.append(json.dumps(
+            {"rating": rating, "score": score, "steps": steps},
+            sort_keys=True))
+
+    return results
+
+
+def _map_chunks(func, args, items, workers, chunksize):
+    """Yield the results of func for chunks of items in input order.
+
+    func is called with (args, chunk) for each chunk of items and must
+    return a list of results. With multiple workers, at most two chunks
+    per worker are waiting to be processed or collected.
+
+    This is an internal function and should not be used
+    outside of the batch and generate modules.
+    """
+    items = iter(items)
+    chunks = iter(lambda: list(islice(items, chunksize)), [])
+
+    if workers is None:
+        workers = cpu_count()
+
+    if workers <= 1:
+        for chunk in chunks:
+            for result in func((args, chunk)):
+                yield result
+        return
+
+    pool = Pool(workers)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(func, ((args, chunk),)))
+            if len(pending) >= 2 * workers:
+                for result in pending.popleft().get():
+                    yield result
+
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,206 @@
+"""Cache results of solving and analyzing sudokus.
+
+Classes defined here:
+ * Cache: Base class of all caches.
+ * MemoryCache: Keep results in memory.
+ * SQLiteCache: Keep results in a sqlite3 database file.
+
+Functions defined here:
+ * get_cache(): Return the cache used by the analyze and solvers modules.
+ * set_cache(): Set the cache used by the analyze and solvers modules.
+ * puzzle_key(): Return the key of a sudoku.
+
+By default no cache is used. After calling set_cache(), solvers.solve()
+and analyze.rate(), score(), statistics() and is_unique() look up their
+results in the cache and store new results in it, e.g. after::
+
+    set_cache(MemoryCache(maxsize=10000))
+
+A cache maps keys to records (dicts of JSON-serializable values).
+Solutions, solve steps, rating and score are stored for the exact sudoku
+(see puzzle_key()). Uniqueness doesn't change, if a sudoku is transformed
+(see analyze.canonical()), so it's stored for the canonical form of the
+sudoku, if Cache.canonical is True.
+"""
+
+import json
+import sqlite3
+from collections import OrderedDict
+
+_CACHE = None
+
+
+def get_cache():
+    """Return the cache used by the analyze and solvers modules (or None)."""
+    return _CACHE
+
+
+def set_cache(cache):
+    """Set the cache used by the analyze and solvers modules.
+
+    Args:
+        cache (Cache): The cache to use or None to disable caching.
+    """
+    global _CACHE
+    _CACHE = cache
+
+
+def puzzle_key(sudoku):
+    """Return the key of a sudoku, which is used for its solution.
+
+    Args:
+        sudoku (Sudoku): The sudoku (candidates are ignored).
+
+    Returns:
+        str: The box size and numbers of the sudoku, e.g.
+             "3x3:0,0,3,0,2,0,6,0,0,9,...".
+    """
+    return "%dx%d:%s" % (
+        sudoku.box_width, sudoku.box_height, sudoku.encode(col_sep=","))
+
+
+class Cache(object):
+    """Base class of all caches.
+
+    Subclasses must implement get(), set(), clear() and __len__().
+
+    Attributes:
+        maxsize (int): The maximum number of records (or None). If there
+                       are more records, the least recently used records
+                       are removed.
+        canonical (bool): Store uniqueness, which is the same for
+                          equivalent sudokus, using the canonical form
+                          of the sudoku.
+    """
+
+    def __init__(self, maxsize=None, canonical=True):
+        self.maxsize = maxsize
+        self.canonical = canonical
+
+    def get(self, key):
+        """Return the record stored for key or None."""
+        raise NotImplementedError(
+            "%s.get() not implemented." % self.__class__.__name__)
+
+    def set(self, key, record):
+        """Store the record (a dict) for key."""
+        raise NotImplementedError(
+            "%s.set() not implemented." % self.__class__.__name__)
+
+    def clear(self):
+        """Remove all records."""
+        raise NotImplementedError(
+            "%s.clear() not implemented." % self.__class__.__name__)
+
+    def __len__(self):
+        raise NotImplementedError(
+            "%s.__len__() not implemented." % self.__class__.__name__)
+
+    def update(self, key, **values):
+        """Add the given values to the record stored for key."""
+        record = self.get(key) or {}
+        record.update(values)
+        self.set(key, record)
+
+
+class MemoryCache(Cache):
+    """Keep records in memory.
+
+    The records are not copied, so they must not be changed
+    after they have been stored or returned.
+    """
+
+    def __init__(self, maxsize=1024, canonical=True):
+        super(MemoryCache, self).__init__(maxsize, canonical)
+        self.__records = OrderedDict()
+
+    def get(self, key):
+        try:
+            record = self.__records.pop(key)
+        except KeyError:
+            return None
+
+        # reinsert as most recently used
+        self.__records[key] = record
+        return record
+
+    def set(self, key, record):
+        self.__records.pop(key, None)
+        self.__records[key] = record
+
+        if self.maxsize is not None:
+            while len(self.__records) > self.maxsize:
+                self.__records.popitem(last=False)
+
+    def clear(self):
+        self.__records.clear()
+
+    def __len__(self):
+        return len(self.__records)
+
+
+class SQLiteCache(Cache):
+    """Keep records as JSON in a sqlite3 database file.
+
+    The records are kept, when the program ends, and can be shared by
+    multiple processes using the same file.
+    """
+
+    def __init__(self, path, maxsize=None, canonical=True):
+        """Open (or create) the cache in the database file path.
+
+        Args:
+            path (str): The path of the database file (":memory:" keeps
+                        the database in memory).
+            maxsize (int): See Cache.
+            canonical (bool): See Cache.
+        """
+        super(SQLiteCache, self).__init__(maxsize, canonical)
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, used INTEGER)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS records_used ON records (used)")
+
+        used = self.connection.execute(
+            "SELECT MAX(used) FROM records").fetchone()[0]
+        self.__clock = used or 0
+
+    def __tick(self):
+        self.__clock += 1
+        return self.__clock
+
+    def get(self, key):
+        row = self.connection.execute(
+            "SELECT value FROM records WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        self.connection.execute(
+            "UPDATE records SET used = ? WHERE key = ?", (self.__tick(), key))
+        return json.loads(row[0])
+
+    def set(self, key, record):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO records (key, value, used) "
+            "VALUES (?, ?, ?)", (key, json.dumps(record), self.__tick()))
+
+        if self.maxsize is not None:
+            count = len(self) - self.maxsize
+            if count > 0:
+                self.connection.execute(
+                    "DELETE FROM records WHERE key IN ("
+                    "SELECT key FROM records ORDER BY used LIMIT ?)",
+                    (count,))
+
+    def clear(self):
+        self.connection.execute("DELETE FROM records")
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        """Close the database file."""
+        self.connection.close()
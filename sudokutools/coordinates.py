@@ -1,6 +1,10 @@
 """Calculate Sudoku coordinates
 
+Classes defined here:
+ * Geometry:         Precomputed coordinates and houses of a sudoku size.
+
 Functions defined here:
+ * geometry():       Return the (cached) Geometry of a given box size.
  * box_at():         Return the box index of a given field.
  * box_of():         Return all coordinates in the region of (col, row) as a list.
  * column_of():      Return all coordinates in the column of (col, row) as a list.
@@ -46,6 +50,147 @@ Note::
 from itertools import product
 
 
+class Geometry(object):
+    """Precomputed coordinates and houses of a sudoku with a given box size.
+
+    Don't create instances of this class directly, but use geometry(),
+    which returns one cached instance per box size. All attributes are
+    tuples and must not be changed.
+
+    Fields are referenced by their flat index ``row * size + col``.
+    Houses (rows, columns and boxes) are numbered in this order:
+    rows get the numbers 0 to size-1, columns size to 2*size-1 and
+    boxes 2*size to 3*size-1.
+
+    Attributes:
+        box_width (int), box_height (int): The box size.
+        size (int): The number of fields in a row (width * height).
+        indices (tuple of int): The valid row, column and box indices.
+        numbers (tuple of int): The valid numbers (1 to size).
+        coords (tuple of (int, int)): (row, col) of each field index.
+        row_at, column_at, box_at (tuple of int): The row, column
+            and box of each field index.
+        rows, columns, boxes (tuple of tuple of int): The field
+            indices in each row, column and box.
+        houses (tuple of tuple of int): rows + columns + boxes.
+        houses_of (tuple of (int, int, int)): The house numbers of the
+            row, column and box of each field index.
+        peers (tuple of tuple of int): The indices of all fields
+            in the same row, column or box of each field index (in the
+            same order as surrounding_of() with include=False).
+    """
+
+    def __init__(self, width, height):
+        self.box_width = width
+        self.box_height = height
+        self.size = size = width * height
+        self.indices = indices = tuple(range(size))
+        self.numbers = tuple(range(1, size + 1))
+        self.coords = coords = tuple(product(indices, repeat=2))
+        cells = range(size ** 2)
+
+        self.row_at = tuple(i // size for i in cells)
+        self.column_at = tuple(i % size for i in cells)
+        self.box_at = tuple(
+            box_at(row, col, width, height) for row, col in coords)
+
+        self.rows = tuple(
+            tuple(row * size + col for col in indices) for row in indices)
+        self.columns = tuple(
+            tuple(row * size + col for row in indices) for col in indices)
+        self.boxes = tuple(
+            tuple(row * size + col for row, col in the_box(box, width, height))
+            for box in indices)
+        self.houses = self.rows + self.columns + self.boxes
+        self.houses_of = tuple(
+            (self.row_at[i], size + self.column_at[i], 2 * size + self.box_at[i])
+            for i in cells)
+
+        # coordinate tuples returned by the *_of() functions
+        self._row_coords = tuple(
+            tuple(coords[i] for i in row) for row in self.rows)
+        self._column_coords = tuple(
+            tuple(coords[i] for i in col) for col in self.columns)
+        self._box_coords = tuple(
+            tuple(coords[i] for i in box) for box in self.boxes)
+
+        self._row_coords_without = tuple(
+            tuple(c for c in self._row_coords[self.row_at[i]] if c != coords[i])
+            for i in cells)
+        self._column_coords_without = tuple(
+            tuple(c for c in self._column_coords[self.column_at[i]]
+                  if c != coords[i])
+            for i in cells)
+        self._box_coords_without = tuple(
+            tuple(c for c in self._box_coords[self.box_at[i]] if c != coords[i])
+            for i in cells)
+
+        # The rest of the box, which is neither in the row nor in the column.
+        box_rest = [
+            tuple((r, c) for r, c in self._box_coords[self.box_at[i]]
+                  if r != coords[i][0] and c != coords[i][1])
+            for i in cells]
+
+        # surrounding_of() with include=True contains the field itself
+        # once within the column part (for historical reasons).
+        self._surrounding_coords = tuple(
+            self._row_coords_without[i] + self._column_coords[self.column_at[i]] +
+            box_rest[i] for i in cells)
+        self._surrounding_coords_without = tuple(
+            self._row_coords_without[i] + self._column_coords_without[i] +
+            box_rest[i] for i in cells)
+
+        self.peers = tuple(
+            tuple(row * size + col for row, col in surrounding)
+            for surrounding in self._surrounding_coords_without)
+
+    def row_of(self, row, col, include=True):
+        """Same as row_of(), but returns a tuple."""
+        if include:
+            return self._row_coords[row]
+        return self._row_coords_without[row * self.size + col]
+
+    def column_of(self, row, col, include=True):
+        """Same as column_of(), but returns a tuple."""
+        if include:
+            return self._column_coords[col]
+        return self._column_coords_without[row * self.size + col]
+
+    def box_of(self, row, col, include=True):
+        """Same as box_of(), but returns a tuple."""
+        if include:
+            return self._box_coords[self.box_at[row * self.size + col]]
+        return self._box_coords_without[row * self.size + col]
+
+    def surrounding_of(self, row, col, include=True):
+        """Same as surrounding_of(), but returns a tuple."""
+        if include:
+            return self._surrounding_coords[row * self.size + col]
+        return self._surrounding_coords_without[row * self.size + col]
+
+
+_GEOMETRIES = {}
+
+
+def geometry(width=3, height=3):
+    """Return the Geometry for sudokus with the given box size.
+
+    Geometry instances are created once per box size and cached.
+
+    Args:
+        width (int): The width of the sudoku.
+        height (int): The height of the sudoku.
+
+    Returns:
+        Geometry: The precomputed geometry.
+    """
+    try:
+        return _GEOMETRIES[width, height]
+    except KeyError:
+        geo = _GEOMETRIES[width, height] = Geometry(width, height)
+        return geo
+
+
 def box_at(row, col, width=3, height=3):
     """Return the box index of the field at (row, col)
 
@@ -75,14 +220,7 @@ def box_of(row, col, width=3, height=3, include=True):
         list of (int, int): list of pairs (row, column) of all fields in
                             the same box (region).
     """
-    grid_x = col - (col % width)
-    grid_y = row - (row % height)
-
-    coords = [(grid_y + i, grid_x + j)
-              for i in range(height) for j in range(width)]
-    if not include:
-        coords.remove((row, col))
-    return coords
+    return list(geometry(width, height).box_of(row, col, include))
 
 
 def column_of(row, col, width=3, height=3, include=True):
@@ -99,7 +237,7 @@ def column_of(row, col, width=3, height=3, include=True):
         list of (int, int): list of pairs (row, column) of all fields in
                             the same column.
     """
-    return [(i, col) for i in range(width * height) if include or i != row]
+    return list(geometry(width, height).column_of(row, col, include))
 
 
 def row_of(row, col, width=3, height=3, include=True):
@@ -116,7 +254,7 @@ def row_of(row, col, width=3, height=3, include=True):
         list of (int, int): list of pairs (row, column) of all fields in
                             the same row.
     """
-    return [(row, j) for j in range(width * height) if include or j != col]
+    return list(geometry(width, height).row_of(row, col, include))
 
 
 def surrounding_of(row, col, width=3, height=3, include=True):
@@ -133,31 +271,7 @@ def surrounding_of(row, col, width=3, height=3, include=True):
         list of (int, int): list of pairs (row, column) of all fields in
                             the same column, row or square.
     """
-    coords = row_of(row, col, width, height, include)
-    coords.extend(column_of(row, col, width, height, include))
-    coords.extend(_box_without_row_and_column_of(row, col, width, height))
-
-    # remove two items of (col, row) in coords (there are three)
-    if include:
-        coords.remove((row, col))
-
-    return coords
-
-
-def _box_without_row_and_column_of(row, col, width, height):
-    """Return some coordinates in the square of (col, row) as a list.
-
-    The coordinates in the same row and column are removed.
-
-    This is an internal function and should not be used
-    outside of the coordinates module.
-    """
-    grid_x = col - (col % width)
-    grid_y = row - (row % height)
-
-    return [(grid_y + i, grid_x + j) for i, j in product(
-            range(height), range(width))
-            if grid_y + i != row and grid_x + j != col]
+    return list(geometry(width, height).surrounding_of(row, col, include))
 
 
 def the_box(box, width=3, height=3):
@@ -0,0 +1,378 @@
+"""Store many sudokus in a compact binary file.
+
+Classes defined here:
+ * CorpusWriter: Write sudokus to a corpus file.
+ * Corpus: Read sudokus from a corpus file (memory-mapped).
+
+Functions defined here:
+ * write_corpus(): Write sudokus (and solutions and ratings) to a file.
+
+A corpus file starts with a header of 16 bytes (all values little endian):
+
+    offset  size  value
+    0       4     b"SDKC"
+    4       1     format version (1)
+    5       1     box width
+    6       1     box height
+    7       1     flags (1: packed, 2: solutions, 4: ratings)
+    8       8     number of records
+
+followed by the records, which all have the same size. Each record
+holds the numbers of the sudoku (one byte per field or, if packed, two
+fields per byte with the first field in the high nibble), the numbers
+of its solution in the same format (if the file has solutions) and one
+byte with the rating (if the file has ratings, 255 for no rating).
+Packing is possible for sudokus with N <= 15.
+
+Candidates are not stored. Reading a record doesn't require to parse
+the file up to it, so a Corpus gives fast access to any record::
+
+    from sudokutools.corpus import Corpus, write_corpus
+
+    write_corpus("puzzles.sdk", sudokus)
+    with Corpus("puzzles.sdk") as corpus:
+        sudoku = corpus[123456]
+"""
+
+import mmap
+import struct
+from itertools import chain
+
+from sudokutools.sudoku import Sudoku
+
+MAGIC = b"SDKC"
+VERSION = 1
+
+PACKED = 1
+SOLUTIONS = 2
+RATINGS = 4
+
+NO_RATING = 255
+
+_HEADER = struct.Struct("<4sBBBBQ")
+
+# the high and low nibble of each byte value
+_HIGH = bytes(bytearray(value >> 4 for value in range(256)))
+_LOW = bytes(bytearray(value & 15 for value in range(256)))
+
+
+def _field_bytes(size, packed):
+    """Return the number of bytes used for the fields of a sudoku."""
+    count = size * size
+    return (count + 1) // 2 if packed else count
+
+
+def _pack(numbers):
+    """Pack numbers (bytes, each < 16) to two numbers per byte."""
+    numbers = bytearray(numbers)
+    if len(numbers) % 2:
+        numbers.append(0)
+    return bytes(bytearray(
+        high << 4 | low for high, low in zip(numbers[0::2], numbers[1::2])))
+
+
+def _unpack(data, count):
+    """Return the first count numbers in the packed data as bytes."""
+    numbers = bytearray(2 * len(data))
+    numbers[0::2] = data.translate(_HIGH)
+    numbers[1::2] = data.translate(_LOW)
+    return bytes(numbers[:count])
+
+
+class CorpusWriter(object):
+    """Write sudokus of the same box size to a corpus file.
+
+    The number of records is written to the header by close(), so
+    records can be written one by one without knowing their number.
+    The file must be seekable.
+
+    Example::
+
+        with CorpusWriter("puzzles.sdk", solutions=True) as writer:
+            for sudoku in sudokus:
+                writer.write(sudoku, solution=next(dlx(sudoku)))
+    """
+
+    def __init__(self, path, box_size=(3, 3), packed=None, solutions=False,
+                 ratings=False):
+        """Create the corpus file path (replacing an existing file).
+
+        Args:
+            path (str): The path of the file.
+            box_size (int, int): The box size of all sudokus.
+            packed (bool): Store two fields per byte. None packs, if
+                           possible (N <= 15).
+            solutions (bool): Store a solution for each sudoku.
+            ratings (bool): Store a rating (0..254) for each sudoku.
+
+        Raises:
+            ValueError: if the box size isn't supported or packing isn't
+                        possible.
+        """
+        self.box_size = tuple(box_size)
+        self.size = box_size[0] * box_size[1]
+        if max(self.box_size) > 255 or self.size > 255:
+            raise ValueError("Box size too large: %s" % (box_size,))
+
+        if packed is None:
+            packed = self.size <= 15
+        elif packed and self.size > 15:
+            raise ValueError("Packing requires N <= 15 (N is %d)." % self.size)
+
+        self.packed = packed
+        self.solutions = solutions
+        self.ratings = ratings
+        self.count = 0
+
+        self.__flags = ((PACKED if packed else 0) |
+                        (SOLUTIONS if solutions else 0) |
+                        (RATINGS if ratings else 0))
+        self.__file = open(path, "wb")
+        self.__write_header()
+
+    def __write_header(self):
+        self.__file.seek(0)
+        self.__file.write(_HEADER.pack(
+            MAGIC, VERSION, self.box_size[0], self.box_size[1],
+            self.__flags, self.count))
+
+    def __encode(self, sudoku):
+        """Return the numbers of sudoku as stored in the file."""
+        if sudoku.box_size != self.box_size:
+            raise ValueError("Sudoku has box size %s (expected %s)." % (
+                sudoku.box_size, self.box_size))
+
+        numbers = [sudoku.get_at(i) for i in range(len(sudoku))]
+        if min(numbers) < 0 or max(numbers) > self.size:
+            raise ValueError("Sudoku has numbers outside of 0..%d." % (
+                self.size))
+
+        numbers = bytes(bytearray(numbers))
+        return _pack(numbers) if self.packed else numbers
+
+    def write(self, sudoku, solution=None, rating=None):
+        """Append a sudoku to the file.
+
+        Args:
+            sudoku (Sudoku): The sudoku to write.
+            solution (Sudoku): Its solution (if the file has solutions,
+                               None stores an empty sudoku).
+            rating (int): Its rating (if the file has ratings, None
+                          stores NO_RATING).
+
+        Raises:
+            ValueError: if the sudoku, solution or rating can't be stored.
+        """
+        data = [self.__encode(sudoku)]
+
+        if self.solutions:
+            if solution is None:
+                solution = Sudoku(box_size=self.box_size)
+            data.append(self.__encode(solution))
+
+        if self.ratings:
+            if rating is None:
+                rating = NO_RATING
+            elif not 0 <= rating < NO_RATING:
+                raise ValueError("Rating must be in 0..%d." % (NO_RATING - 1))
+            data.append(bytes(bytearray([rating])))
+
+        self.__file.write(b"".join(data))
+        self.count += 1
+
+    def close(self):
+        """Write the number of records to the header and close the file."""
+        if self.__file.closed:
+            return
+
+        self.__file.seek(0, 2)
+        end = self.__file.tell()
+        self.__write_header()
+        self.__file.seek(end)
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_corpus(path, sudokus, solutions=None, ratings=None, packed=None,
+                 box_size=None):
+    """Write sudokus (and their solutions and ratings) to a corpus file.
+
+    Args:
+        path (str): The path of the file.
+        sudokus (iterable of Sudoku): The sudokus to write.
+        solutions (iterable of Sudoku): Their solutions (or None).
+        ratings (iterable of int): Their ratings (or None).
+        packed (bool): See CorpusWriter.
+        box_size (int, int): The box size of the sudokus. Defaults to
+                             the box size of the first sudoku or (3, 3).
+
+    Returns:
+        int: The number of sudokus written.
+    """
+    sudokus = iter(sudokus)
+    first = next(sudokus, None)
+    if box_size is None:
+        box_size = first.box_size if first is not None else (3, 3)
+
+    solutions = iter(solutions) if solutions is not None else None
+    ratings = iter(ratings) if ratings is not None else None
+
+    with CorpusWriter(path, box_size, packed, solutions is not None,
+                      ratings is not None) as writer:
+        if first is None:
+            return 0
+
+        for sudoku in chain([first], sudokus):
+            solution = next(solutions) if solutions is not None else None
+            rating = next(ratings) if ratings is not None else None
+            writer.write(sudoku, solution, rating)
+        return writer.count
+
+
+class Corpus(object):
+    """Read sudokus from a corpus file.
+
+    The file is memory-mapped, so opening it is fast regardless of its
+    size and only the records accessed are read. Records are decoded,
+    when they are accessed:
+
+     * corpus[i]: The sudoku with index i (a new Sudoku instance).
+     * corpus.solution(i): Its solution (or None).
+     * corpus.rating(i): Its rating (or None).
+     * corpus.view(i): The stored fields of sudoku i as memoryview
+       (zero-copy, packed if the file is packed).
+
+    The numbers of all sudokus of an unpacked file can be used as a
+    single array without copying, e.g. with NumPy::
+
+        numbers = numpy.frombuffer(
+            corpus.records(), dtype=numpy.uint8).reshape(
+            len(corpus), -1)[:, :corpus.size ** 2]
+
+    Attributes:
+        box_size (int, int): The box size of all sudokus.
+        size (int): The number of fields in a row (N).
+        packed (bool): If two fields are stored per byte.
+        has_solutions (bool): If the file holds solutions.
+        has_ratings (bool): If the file holds ratings.
+        record_size (int): The number of bytes of each record.
+    """
+
+    def __init__(self, path):
+        """Open the corpus file path.
+
+        Raises:
+            ValueError: if the file isn't a valid corpus file.
+        """
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError("%s is not a corpus file." % path)
+
+            magic, version, width, height, flags, count = _HEADER.unpack(
+                header)
+            if magic != MAGIC:
+                raise ValueError("%s is not a corpus file." % path)
+            if version != VERSION:
+                raise ValueError(
+                    "Unsupported corpus format version: %d" % version)
+
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.box_size = (width, height)
+        self.size = width * height
+        self.packed = bool(flags & PACKED)
+        self.has_solutions = bool(flags & SOLUTIONS)
+        self.has_ratings = bool(flags & RATINGS)
+
+        self.__fields = _field_bytes(self.size, self.packed)
+        self.record_size = self.__fields * (2 if self.has_solutions else 1)
+        if self.has_ratings:
+            self.record_size += 1
+
+        self.__count = count
+        self.__data = memoryview(self.__mmap)
+        if len(self.__data) < _HEADER.size + count * self.record_size:
+            self.close()
+            raise ValueError("%s is truncated." % path)
+
+    def __len__(self):
+        return self.__count
+
+    def __offset(self, i):
+        """Return the offset of record i in the file."""
+        if i < 0:
+            i += self.__count
+        if not 0 <= i < self.__count:
+            raise IndexError("Corpus index out of range: %d" % i)
+        return _HEADER.size + i * self.record_size
+
+    def records(self):
+        """Return all records as memoryview (zero-copy)."""
+        return self.__data[
+            _HEADER.size:_HEADER.size + self.__count * self.record_size]
+
+    def view(self, i):
+        """Return the stored fields of sudoku i as memoryview (zero-copy)."""
+        offset = self.__offset(i)
+        return self.__data[offset:offset + self.__fields]
+
+    def numbers(self, i):
+        """Return the numbers of sudoku i as bytes (one byte per field)."""
+        return self.__numbers(self.__offset(i))
+
+    def __numbers(self, offset):
+        data = self.__mmap[offset:offset + self.__fields]
+        if self.packed:
+            return _unpack(data, self.size * self.size)
+        return data
+
+    def __sudoku(self, offset):
+        sudoku = Sudoku(box_size=self.box_size)
+        for i, value in enumerate(bytearray(self.__numbers(offset))):
+            if value:
+                sudoku.set_at(i, value)
+        return sudoku
+
+    def __getitem__(self, i):
+        """Return sudoku i as new Sudoku instance."""
+        return self.__sudoku(self.__offset(i))
+
+    def __iter__(self):
+        for i in range(self.__count):
+            yield self.__sudoku(_HEADER.size + i * self.record_size)
+
+    def solution(self, i):
+        """Return the solution of sudoku i (or None without solutions)."""
+        if not self.has_solutions:
+            return None
+        return self.__sudoku(self.__offset(i) + self.__fields)
+
+    def rating(self, i):
+        """Return the rating of sudoku i (or None without a rating)."""
+        if not self.has_ratings:
+            return None
+        end = self.__offset(i) + self.record_size
+        rating = bytearray(self.__mmap[end - 1:end])[0]
+        return None if rating == NO_RATING else rating
+
+    def close(self):
+        """Close the file.
+
+        Raises:
+            BufferError: if views returned by view() or records() are
+                         still in use (release() them before).
+        """
+        self.__data.release()
+        self.__mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -5,7 +5,14 @@ module. It is used by the sudokutools.solve.dlx() function.
 
 None of the functions provided here should be used directly!
 
-The original code was written by Ali Assaf and has
+The module contains two engines:
+ * do_dlx(): Algorithm X using dicts of sets (by Ali Assaf, see below).
+ * do_links(): Knuth's dancing links using preallocated integer lists.
+
+count_links() counts solutions using the dancing links engine and
+ClueStack removes clues from a solved sudoku for generate().
+
+The original code of do_dlx() was written by Ali Assaf and has
 been slightly adapted to be used with the sudokutools library.
 Written permission to use it under the MIT-License has been
 granted by Ali Assaf (thank you!).
@@ -17,12 +24,31 @@ Information about the original work:
  * License: GNU General Public License <http://www.gnu.org/licenses/>
 """
 
+import threading
 from itertools import product
 
+# exact cover matrices (X, Y) keyed by (box_width, box_height)
+_MATRICES = {}
 
-def do_dlx(sudoku):
-    """ An efficient Sudoku solver using Algorithm X (works _in_place_)."""
-    R, C = sudoku.box_height, sudoku.box_width
+
+def matrix(sudoku):
+    """Return a fresh copy of the exact cover matrix for the sudoku.
+
+    The matrix is only built once for each box size. Y is shared
+    between all copies (it's never changed), while X is copied.
+    """
+    try:
+        X, Y = _MATRICES[sudoku.box_size]
+    except KeyError:
+        X, Y = _MATRICES[sudoku.box_size] = build_matrix(
+            sudoku.box_width, sudoku.box_height)
+
+    return {j: set(rows) for j, rows in X.items()}, Y
+
+
+def build_matrix(box_width, box_height):
+    """Build the exact cover matrix (X, Y) for the given box size."""
+    R, C = box_height, box_width
     N = R * C
     X = ([("rc", rc) for rc in product(range(N), range(N))] +
          [("rn", rn) for rn in product(range(N), range(1, N + 1))] +
@@ -38,7 +64,12 @@ def do_dlx(sudoku):
             ("cn", (c, n)),
             ("bn", (b, n))]
 
-    X, Y = exact_cover(X, Y)
+    return exact_cover(X, Y)
+
+
+def do_dlx(sudoku):
+    """ An efficient Sudoku solver using Algorithm X (works _in_place_)."""
+    X, Y = matrix(sudoku)
     for row, col in sudoku:
         n = sudoku[row, col]
         if n:
@@ -63,17 +94,36 @@ def exact_cover(X, Y):
 
 
 def solve(X, Y, solution):
-    if not X:
-        yield list(solution)
-    else:
-        c = min(X, key=lambda c: len(X[c]))
-        for r in list(X[c]):
-            solution.append(r)
-            cols = select(X, Y, r)
-            for s in solve(X, Y, solution):
-                yield s
-            deselect(X, Y, r, cols)
-            solution.pop()
+    # Algorithm X without recursion: For each level of the search we
+    # keep the rows left to try (reversed) and the columns removed by
+    # the currently selected row (or None).
+    rows_left = []
+    removed = []
+
+    while True:
+        if not X:
+            yield list(solution)
+        else:
+            c = min(X, key=lambda c: len(X[c]))
+            rows_left.append(list(X[c])[::-1])
+            removed.append(None)
+
+        # backtrack to the next row to try
+        while rows_left:
+            if removed[-1] is not None:
+                deselect(X, Y, solution.pop(), removed[-1])
+                removed[-1] = None
+
+            if rows_left[-1]:
+                r = rows_left[-1].pop()
+                solution.append(r)
+                removed[-1] = select(X, Y, r)
+                break
+
+            rows_left.pop()
+            removed.pop()
+        else:
+            return
 
 
 def select(X, Y, r):
@@ -94,3 +144,464 @@ def deselect(X, Y, r, cols):
             for k in Y[i]:
                 if k != j:
                     X[k].add(i)
+
+
+# DancingLinks templates keyed by (box_width, box_height)
+_LINKS = {}
+
+# copies of the templates used by count_links() in each thread
+_THREAD_LINKS = threading.local()
+
+
+def template(sudoku):
+    """Return the cached dancing links matrix for the box size of the sudoku.
+
+    The template is shared by all threads and must be left unchanged
+    (see links()).
+    """
+    try:
+        return _LINKS[sudoku.box_size]
+    except KeyError:
+        matrix = _LINKS[sudoku.box_size] = DancingLinks(
+            sudoku.box_width, sudoku.box_height)
+        return matrix
+
+
+def links(sudoku):
+    """Return a fresh copy of the dancing links matrix for the sudoku.
+
+    The matrix is only built once for each box size and copied afterwards.
+    """
+    return template(sudoku).copy()
+
+
+class DancingLinks(object):
+    """The exact cover matrix of a sudoku as dancing links.
+
+    All nodes are stored in preallocated lists of integers (left, right,
+    up, down, column and the column sizes). Node 0 is the root, nodes 1
+    to 4 * N**2 are the column headers and each of the N**3 matrix rows
+    has 4 nodes following the headers.
+
+    Matrix row k represents the number k % N + 1 in the field with the
+    flat index k // N. The columns are the constraints: one number in
+    each field, each number once in every row, column and box.
+    """
+
+    def __init__(self, box_width, box_height):
+        self.size = N = box_width * box_height
+        cols = 4 * N * N
+        self.first = first = cols + 1
+        nodes = first + 4 * N ** 3
+
+        L = self.left = [0] * nodes
+        R = self.right = [0] * nodes
+        U = self.up = list(range(nodes))
+        D = self.down = list(range(nodes))
+        C = self.column = [0] * nodes
+        S = self.count = [0] * (cols + 1)
+
+        # circular list of column headers (including the root)
+        for h in range(cols + 1):
+            L[h] = h - 1
+            R[h] = h + 1
+        L[0] = cols
+        R[cols] = 0
+
+        node = first
+        for r, c, d in product(range(N), range(N), range(N)):
+            b = (r // box_height) * box_height + c // box_width
+            headers = (
+                1 + r * N + c,
+                1 + N * N + r * N + d,
+                1 + 2 * N * N + c * N + d,
+                1 + 3 * N * N + b * N + d)
+
+            for i, h in enumerate(headers):
+                C[node + i] = h
+                S[h] += 1
+
+                # append the node to the bottom of the column
+                U[node + i] = U[h]
+                D[node + i] = h
+                D[U[h]] = node + i
+                U[h] = node + i
+
+                L[node + i] = node + (i - 1) % 4
+                R[node + i] = node + (i + 1) % 4
+
+            node += 4
+
+        # nodes of the selected rows
+        self.solution = []
+
+    def copy(self):
+        """Return an independent copy of this matrix."""
+        links = DancingLinks.__new__(DancingLinks)
+        links.size = self.size
+        links.first = self.first
+        links.left = self.left[:]
+        links.right = self.right[:]
+        links.up = self.up[:]
+        links.down = self.down[:]
+        links.column = self.column
+        links.count = self.count[:]
+        links.solution = self.solution[:]
+        return links
+
+    def cover(self, c):
+        """Remove column c and all rows in it from the matrix."""
+        L, R, U, D, C, S = (
+            self.left, self.right, self.up, self.down, self.column, self.count)
+
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        """Undo cover(c)."""
+        L, R, U, D, C, S = (
+            self.left, self.right, self.up, self.down, self.column, self.count)
+
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+
+        L[R[c]] = c
+        R[L[c]] = c
+
+    def row(self, node):
+        """Return the matrix row of the given node."""
+        return (node - self.first) // 4
+
+    def select(self, row):
+        """Put the given matrix row into the solution.
+
+        Returns:
+            bool: False, if the row conflicts with the already
+                  selected rows (nothing is changed in this case).
+        """
+        R, C = self.right, self.column
+        node = self.first + 4 * row
+
+        # all columns of the row must still be present
+        for j in range(node, node + 4):
+            c = C[j]
+            if R[self.left[c]] != c:
+                return False
+
+        self.solution.append(node)
+        for j in range(node, node + 4):
+            self.cover(C[j])
+        return True
+
+    def select_numbers(self, sudoku):
+        """Select the rows of all numbers in the sudoku.
+
+        Returns:
+            bool: False, if the numbers have conflicts or are not in
+                  range(1, N + 1) (the rows selected so far stay
+                  selected in this case).
+        """
+        N = self.size
+        for i in range(len(sudoku)):
+            n = sudoku.get_at(i)
+            if n and (not 0 < n <= N or not self.select(i * N + n - 1)):
+                return False
+        return True
+
+    def hide(self, row):
+        """Remove the given matrix row from its columns.
+
+        The columns of the row must not be covered. Call unhide() with
+        the matrix in the same state to undo this.
+        """
+        U, D, C, S = self.up, self.down, self.column, self.count
+        node = self.first + 4 * row
+        for j in range(node, node + 4):
+            U[D[j]] = U[j]
+            D[U[j]] = D[j]
+            S[C[j]] -= 1
+
+    def unhide(self, row):
+        """Undo hide(row)."""
+        U, D, C, S = self.up, self.down, self.column, self.count
+        node = self.first + 4 * row
+        for j in range(node + 3, node - 1, -1):
+            S[C[j]] += 1
+            U[D[j]] = j
+            D[U[j]] = j
+
+    def deselect(self):
+        """Remove the last selected row from the solution."""
+        L, C = self.left, self.column
+        node = self.solution.pop()
+        j = L[node]
+        while j != node:
+            self.uncover(C[j])
+            j = L[j]
+        self.uncover(C[node])
+
+    def search(self):
+        """Yield all solutions (works without recursion).
+
+        Yields:
+            list of int: The selected nodes (valid until the next
+                         solution is requested).
+        """
+        L, R, D, C, S = (
+            self.left, self.right, self.down, self.column, self.count)
+        first = self.first
+        solution = self.solution
+        depth = len(solution)
+
+        while True:
+            # choose the column with the least rows
+            c = R[0]
+            if c == 0:
+                yield solution
+                node = c
+            else:
+                size = S[c]
+                j = R[c]
+                while j != 0 and size > 1:
+                    if S[j] < size:
+                        c = j
+                        size = S[j]
+                    j = R[j]
+
+                if size:
+                    self.cover(c)
+                    node = D[c]
+                else:
+                    # dead end: backtrack without covering c
+                    node = 0
+
+            # try the next row in column c, backtrack if there is none
+            # (node is the root or a column header in this case).
+            while node < first:
+                if node:
+                    self.uncover(node)
+
+                if len(solution) == depth:
+                    return
+
+                node = solution.pop()
+                j = L[node]
+                while j != node:
+                    self.uncover(C[j])
+                    j = L[j]
+                node = D[node]
+
+            solution.append(node)
+            j = R[node]
+            while j != node:
+                self.cover(C[j])
+                j = R[j]
+
+    def count_solutions(self, limit=None):
+        """Count the solutions found by search(), but at most limit.
+
+        This is the same search as search(), but it only counts the
+        solutions without handing them out. Uniqueness checks use
+        limit=2 and stop at the second solution. The matrix is left in
+        the state, in which counting stopped (use deselect() to restore
+        it).
+
+        Returns:
+            int: The number of solutions found.
+        """
+        if limit is not None and limit <= 0:
+            return 0
+
+        L, R, D, C, S = (
+            self.left, self.right, self.down, self.column, self.count)
+        cover, uncover = self.cover, self.uncover
+        first = self.first
+        solution = self.solution
+        depth = len(solution)
+        found = 0
+
+        while True:
+            # choose the column with the least rows
+            c = R[0]
+            if c == 0:
+                found += 1
+                if found == limit:
+                    return found
+                node = c
+            else:
+                size = S[c]
+                j = R[c]
+                while j != 0 and size > 1:
+                    if S[j] < size:
+                        c = j
+                        size = S[j]
+                    j = R[j]
+
+                if size:
+                    cover(c)
+                    node = D[c]
+                else:
+                    node = 0
+
+            # backtrack like search()
+            while node < first:
+                if node:
+                    uncover(node)
+
+                if len(solution) == depth:
+                    return found
+
+                node = solution.pop()
+                j = L[node]
+                while j != node:
+                    uncover(C[j])
+                    j = L[j]
+                node = D[node]
+
+            solution.append(node)
+            j = R[node]
+            while j != node:
+                cover(C[j])
+                j = R[j]
+
+
+class ClueStack(object):
+    """Remove clues from a solved sudoku, while it stays unique.
+
+    The clues are selected in a single dancing links matrix in the
+    reverse order of their removal, so the group of clues removed next
+    is always on top of the solution stack (only clues kept by remove()
+    are selected above it). This way no matrix has to be set up for a
+    single removal.
+
+    If the sudoku is unique, every other solution of the sudoku without
+    the removed clues must differ from the known solution in one of these
+    clues. So a search for a single solution (with the row of the known
+    number hidden) is done for each of them.
+    """
+
+    def __init__(self, solution, groups):
+        """Create a new ClueStack.
+
+        Args:
+            solution (Sudoku): The solved sudoku.
+            groups (list of list of int): The flat indices of the fields
+                in each group of clues, in the order of their removal.
+        """
+        self.matrix = matrix = links(solution)
+        N = matrix.size
+        self.rows = [
+            i * N + solution.get_at(i) - 1 for i in range(len(solution))]
+        self.groups = list(reversed(groups))
+        # rows, which have been selected again by remove()
+        self.kept = []
+
+        for group in self.groups:
+            for i in group:
+                matrix.select(self.rows[i])
+
+    def remove(self):
+        """Remove the next group of clues, if the sudoku stays unique.
+
+        Returns:
+            bool: True, if the clues have been removed and False, if
+                  they have been kept.
+        """
+        matrix = self.matrix
+        group = self.groups.pop()
+        rows = [self.rows[i] for i in group]
+
+        for _ in range(len(self.kept) + len(group)):
+            matrix.deselect()
+        for row in self.kept:
+            matrix.select(row)
+
+        depth = len(matrix.solution)
+        for row in rows:
+            matrix.hide(row)
+            found = matrix.count_solutions(limit=1)
+            while len(matrix.solution) > depth:
+                matrix.deselect()
+            matrix.unhide(row)
+
+            if found:
+                for kept_row in rows:
+                    matrix.select(kept_row)
+                self.kept.extend(rows)
+                return False
+
+        return True
+
+
+def given_links(sudoku):
+    """Return the dancing links matrix with all numbers of the sudoku selected.
+
+    Returns None, if the numbers of the sudoku have conflicts.
+    """
+    matrix = links(sudoku)
+    if not matrix.select_numbers(sudoku):
+        return None
+    return matrix
+
+
+def do_links(sudoku):
+    """Solve the sudoku using dancing links (works _in_place_)."""
+    matrix = given_links(sudoku)
+    if matrix is None:
+        return
+
+    N = matrix.size
+    for solution in matrix.search():
+        for node in solution:
+            i, d = divmod(matrix.row(node), N)
+            sudoku.set_at(i, d + 1)
+        yield sudoku
+
+
+def count_links(sudoku, limit=None):
+    """Return the number of solutions of the sudoku (at most limit).
+
+    Counting never hands out the matrix, so each thread reuses its own
+    copy of the template and restores it afterwards. This makes
+    uniqueness checks (limit=2) as cheap as the search itself.
+    """
+    if limit is not None and limit <= 0:
+        return 0
+
+    matrices = _THREAD_LINKS.__dict__
+    try:
+        matrix = matrices[sudoku.box_size]
+    except KeyError:
+        matrix = matrices[sudoku.box_size] = links(sudoku)
+
+    try:
+        if matrix.select_numbers(sudoku):
+            found = matrix.count_solutions(limit)
+        else:
+            found = 0
+
+        while matrix.solution:
+            matrix.deselect()
+    except BaseException:
+        # the matrix may be broken now, copy the template next time
+        matrices.pop(sudoku.box_size, None)
+        raise
+
+    return found
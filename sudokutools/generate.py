@@ -4,22 +4,16 @@ Functions defined here:
  * create_solution(): Create a complete sudoku without conflicts.
  * generate(): Create a new sudoku.
  * generate_from_template(): Create a new sudoku given a template pattern.
-
-Warning:
-    Since the functions in this module work using recursion,
-    generating very large Sudokus will likely
-    To be more precise: Python will raise an RecursionError,
-    if ``box_width * box_height >= sys.getrecursionlimit()``.
-
-    If you really want to generate Sudokus of this size using sudokutools,
-    you have to increase the recursion limit of Python. See:
-    https://stackoverflow.com/questions/3323001/what-is-the-maximum-recursion-depth-in-python-and-how-to-increase-it
+ * generate_many(): Create many new sudokus using multiple processes.
 """
 
+import random
 from collections import defaultdict
-from random import choice, sample, shuffle
+from random import Random, choice, sample, shuffle
 
 from sudokutools.analyze import is_unique
+from sudokutools.batch import _map_chunks
+from sudokutools.dlx import ClueStack
 from sudokutools.solve import dlx
 from sudokutools.sudoku import Sudoku
 
@@ -33,16 +27,24 @@ SYMMETRY = {
 }
 
 
-def create_solution(box_size=(3, 3)):
+def create_solution(box_size=(3, 3), unbiased=False):
     """Returns a sudoku, without empty or conflicting fields.
     
     Args:
         box_size (int, int): box width and box height of the filled sudoku.
                              A standard 9x9 sudoku has box_size=(3, 3).
+        unbiased (bool): By default the solution is created by randomly
+                         transforming a fixed solution (which is very fast,
+                         but only creates solutions equivalent to it).
+                         If True, a random box is filled and the rest is
+                         searched using dlx().
 
     Returns:
         Sudoku: The completely filled Sudoku instance.
     """
+    if not unbiased:
+        return _transform_solution(box_size)
+
     sudoku = Sudoku(box_size=box_size)
 
     # fill a single box and let dlx do the rest
@@ -57,6 +59,59 @@ def create_solution(box_size=(3, 3)):
     return next(dlx(sudoku))
 
 
+def _transform_solution(box_size):
+    """Create a solution by randomly transforming a pattern.
+
+    The transformations don't create conflicts: relabeling numbers,
+    swapping rows within a band (the rows of a box) and whole bands,
+    swapping columns within a stack (the columns of a box) and whole
+    stacks and (if boxes are square) transposing.
+
+    This is an internal function and should not be used
+    outside of the generate module.
+    """
+    sudoku = Sudoku(box_size=box_size)
+    width, height = sudoku.box_width, sudoku.box_height
+    size = width * height
+
+    numbers = list(sudoku.numbers)
+    shuffle(numbers)
+
+    rows = _permutation(height, width)
+    cols = _permutation(width, height)
+    transpose = width == height and choice((False, True))
+
+    i = 0
+    for row in rows:
+        for col in cols:
+            r, c = (col, row) if transpose else (row, col)
+            # the pattern: each row is shifted by width against the
+            # row above and each band by one against the band above.
+            value = (width * (r % height) + r // height + c) % size
+            sudoku.set_at(i, numbers[value])
+            i += 1
+
+    return sudoku
+
+
+def _permutation(length, count):
+    """Return a random order of count groups of length indices each.
+
+    The indices within a group and the groups are shuffled. E.g. for
+    the rows of a sudoku this shuffles the rows within each band as well
+    as the bands.
+    """
+    groups = list(range(count))
+    shuffle(groups)
+
+    indices = []
+    for group in groups:
+        part = list(range(group * length, (group + 1) * length))
+        shuffle(part)
+        indices.extend(part)
+    return indices
+
+
 def generate(min_count=0, symmetry=None, box_size=(3, 3)):
     """Generate a sudoku and return it.
 
@@ -95,29 +150,34 @@ def generate(min_count=0, symmetry=None, box_size=(3, 3)):
     sudoku = solution.copy()
     coords = list(sudoku)
     shuffle(coords)
-    count = len(sudoku)
 
+    # the groups of fields, which are removed together
+    groups = []
     while coords:
-        # get next coordinates to change
-        step_coords = set(symmetry_func(sudoku.box_width, sudoku.box_height, *coords[0]))
+        step_coords = sorted(set(symmetry_func(
+            sudoku.box_width, sudoku.box_height, *coords[0])))
 
         for row, col in step_coords:
             coords.remove((row, col))
 
+        groups.append(step_coords)
+
+    size = sudoku.geometry.size
+    clues = ClueStack(
+        solution, [[row * size + col for row, col in step_coords]
+                   for step_coords in groups])
+    count = len(sudoku)
+
+    for step_coords in groups:
         # break, if this change would set count below min_count
         if count - len(step_coords) < min_count:
             break
 
-        # execute change
-        for row, col in step_coords:
-            sudoku[row, col] = 0
-            count -= 1
-
-        # test, if the change made the sudoku non-unique and revert in this case
-        if not is_unique(sudoku):
+        # remove the fields, if the sudoku stays unique
+        if clues.remove():
             for row, col in step_coords:
-                sudoku[row, col] = solution[row, col]
-                count += 1
+                sudoku[row, col] = 0
+                count -= 1
 
     return sudoku
 
@@ -193,3 +253,66 @@ def generate_from_template(template, tries=100):
 
     raise RuntimeError(
         "Failed to generate sudoku from template within %d tries." % tries)
+
+
+def generate_many(n, workers=None, min_count=0, symmetry=None,
+                  box_size=(3, 3), seed=None):
+    """Generate n sudokus using a pool of worker processes.
+
+    Args:
+        n (int): The number of sudokus to generate.
+        workers (int): The number of worker processes. None uses one
+                       process per CPU, 1 generates all sudokus in the
+                       current process.
+        min_count, symmetry, box_size: See generate().
+        seed: If given, the same seed always yields the same sudokus
+              (independent of the number of workers).
+
+    Yields:
+        Sudoku: The generated sudokus (while the others are generated).
+
+    Raises:
+        ValueError, if symmetry is not a valid argument.
+        ValueError, if min_count is larger then len(sudoku).
+
+    Each sudoku gets its own random seed (taken from a random number
+    generator seeded with seed), so the results don't depend on
+    which worker generates which sudoku.
+    """
+    # raise errors here and not in the workers
+    if symmetry not in SYMMETRY:
+        values = ", ".join([str(key) for key in SYMMETRY])
+        raise ValueError("symmetry must be one of %s" % values)
+
+    count_limit = box_size[0] ** 2 * box_size[1] ** 2
+    if min_count > count_limit:
+        raise ValueError("min_count must be <= %d (%d was given)." % (
+            count_limit, min_count))
+
+    rng = Random(seed)
+    seeds = (rng.getrandbits(64) for _ in range(n))
+
+    args = min_count, symmetry, tuple(box_size)
+    for sudoku in _map_chunks(_generate_chunk, args, seeds, workers, 4):
+        yield sudoku
+
+
+def _generate_chunk(task):
+    """Generate a sudoku for each seed in a chunk for generate_many().
+
+    This is an internal function and should not be used
+    outside of the generate module.
+    """
+    (min_count, symmetry, box_size), seeds = task
+
+    # don't change the random state of the caller (workers=1)
+    state = random.getstate()
+    try:
+        sudokus = []
+        for task_seed in seeds:
+            random.seed(task_seed)
+            sudokus.append(generate(
+                min_count=min_count, symmetry=symmetry, box_size=box_size))
+        return sudokus
+    finally:
+        random.setstate(state)
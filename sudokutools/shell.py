@@ -13,8 +13,8 @@ from sudokutools.actions import SetNumber, RemoveCandidates
 from sudokutools.analyze import rate, is_solved, find_conflicts
 from sudokutools.notation import decode_action, encode
 from sudokutools.generate import generate, generate_from_template
-from sudokutools.solve import bruteforce, init_candidates
-from sudokutools.solvers import hints
+from sudokutools.solve import bruteforce, dlx, init_candidates
+from sudokutools.solvers import HintEngine
 from sudokutools.sudoku import Sudoku, view
 
 if sys.version_info[0] <= 2:
@@ -46,8 +46,7 @@ class GameShell(object):
             "rating": "Minimal and maximum rating of a new Sudoku.",
         }
 
-        self.hints = None
-        self.hinted_sudoku = None
+        self.hint_engine = None
 
         # used for undo and redo:
         self.sudokus = []
@@ -59,9 +58,7 @@ class GameShell(object):
         """Creates a new Sudoku"""
         self.sudokus = [generate()]
         self.index = 0
-        self.solution = next(bruteforce(self.sudokus[0]))
-        self.hints = None
-        self.hinted_sudoku = None
+        self.solution = next(dlx(self.sudokus[0]))
 
         print("Generating new sudoku. Rating: %d/10" % rate(self.sudokus[0]))
         if self.settings.get("autocandidates", False):
@@ -69,6 +66,7 @@ class GameShell(object):
             self.autofill(self.sudokus[0], verbose=False)
         else:
             init_candidates(self.sudokus[0], filled_only=True)
+        self.hint_engine = HintEngine(self.sudokus[0])
 
     def get_setting(self, key):
         return self.settings[key][0]
@@ -79,7 +77,8 @@ class GameShell(object):
         self.new_sudoku()
 
         while self.running:
-            sudoku = self.sudokus[self.index].copy(include_candidates=True)
+            # commands, which change the sudoku, work on a copy
+            sudoku = self.sudokus[self.index]
             print(view(sudoku) + "\n")
             print("> ", end="")
             line = input()
@@ -87,14 +86,14 @@ class GameShell(object):
             command = splitted[0]
 
             if command == "hint":
-                if self.hints is None or self.hinted_sudoku != sudoku:
-                    self.hinted_sudoku = sudoku.copy(include_candidates=True)
-                    self.hints = hints(sudoku)
-                try:
-                    print(next(self.hints))
-                except StopIteration:
+                self.hint_engine.update(sudoku)
+                step = self.hint_engine.next_hint()
+                if step is None:
                     print("No more hints available.")
+                else:
+                    print(step)
             elif command == "candidates":
+                sudoku = sudoku.copy(include_candidates=True)
                 init_candidates(sudoku)
             elif command == "conflicts":
                 listed = []
@@ -141,13 +140,15 @@ class GameShell(object):
                 try:
                     action = decode_action(
                         line, sudoku.box_width, sudoku.box_height)
+                    sudoku = sudoku.copy(include_candidates=True)
                     action(sudoku)
                     self.autofill(sudoku, True)
                 except ValueError as e:
                     print("Unknown command '%s'" % line)
 
             # add the new sudoku to the sudokus list, if anything changed.
-            if command not in ("undo", "redo"):
+            if sudoku is not self.sudokus[self.index] and command not in (
+                    "undo", "redo"):
                 if not sudoku.equals(self.sudokus[self.index], candidates=True):
                     self.sudokus = self.sudokus[:self.index + 1]
                     self.sudokus.append(sudoku)
@@ -186,6 +187,10 @@ class GameShell(object):
 
 
 #
+# inspect.getargspec() has been removed in Python 3.11
+_getargspec = getattr(inspect, "getfullargspec", None) or inspect.getargspec
+
+
 # WARNING: Serious meta-programming incoming. :)
 #
 def signature_str(func):
@@ -198,7 +203,7 @@ def signature_str(func):
         'a b=3'
     """
     arg_str = []
-    spec = inspect.getargspec(func)
+    spec = _getargspec(func)
     args, defaults = spec.args, spec.defaults
 
     # ignore first argument on methods.
@@ -3,21 +3,25 @@
 Functions defined here:
  * bruteforce(): Solves a sudoku using brute force.
  * dlx(): Solves a sudoku using the dancing links algorithm-X.
+ * count_solutions(): Counts the solutions of a sudoku.
  * calc_candidates(): Calculates candidates of a field in a sudoku.
+ * calc_candidate_mask(): Calculates candidates of a field as bitmask.
  * init_candidates(): Sets the candidates for all fields in a sudoku.
+ * apply_singles(): Sets all naked and hidden singles in a sudoku.
 
-Warning:
-    Since the functions in this module work using recursion,
-    solving very large Sudokus will likely
-    To be more precise: Python will raise an RecursionError,
-    if ``box_width * box_height >= sys.getrecursionlimit()``.
-
-    If you really want to generate Sudokus of this size using sudokutools,
-    you have to increase the recursion limit of Python. See:
-    https://stackoverflow.com/questions/3323001/what-is-the-maximum-recursion-depth-in-python-and-how-to-increase-it
+The search algorithms used here don't use recursion, so solving
+large sudokus is limited by time only (and not by the recursion limit
+of Python).
 """
 
-from sudokutools.dlx import do_dlx
+from sudokutools.dlx import count_links, do_dlx, do_links
+from sudokutools.sudoku import from_mask, popcount
+
+# Exact cover engines, which can be used by dlx().
+DLX_ENGINES = {
+    "sets": do_dlx,
+    "links": do_links,
+}
 
 
 def calc_candidates(sudoku, row, col):
@@ -32,14 +36,40 @@ def calc_candidates(sudoku, row, col):
     Returns:
         set: A set of candidates for the field at (row, col)
     """
-    if sudoku[row, col]:
-        return {sudoku[row, col]}
-    candidates = set(sudoku.numbers)
+    return set(from_mask(calc_candidate_mask(sudoku, row, col)))
+
 
-    for (i, j) in sudoku.surrounding_of(row, col, include=False):
-        candidates.discard(sudoku[i, j])
+def calc_candidate_mask(sudoku, row, col):
+    """Return the candidates of the sudoku at (row, col) as bitmask.
 
-    return candidates
+    Args:
+        sudoku (Sudoku): The :class:`Sudoku` instance for which the
+                         candidates are calculated.
+        row (int): The row of the field
+        col (int): The column of the field.
+
+    Returns:
+        int: A bitmask of candidates for the field at (row, col)
+             (bit n is set, if n is a candidate).
+    """
+    geo = sudoku.geometry
+    index = row * geo.size + col
+    size = geo.size
+    value = sudoku.get_at(index)
+    if value:
+        # negative numbers can't be represented as bitmask
+        return 1 << value if value > 0 else 0
+
+    # start with bits 1 to N set
+    mask = (2 << size) - 2
+    get_at = sudoku.get_at
+    for i in geo.peers[index]:
+        # ignore numbers outside of the valid range
+        value = get_at(i)
+        if 0 < value <= size:
+            mask &= ~(1 << value)
+
+    return mask
 
 
 def init_candidates(sudoku, filled_only=False):
@@ -58,23 +88,161 @@ def init_candidates(sudoku, filled_only=False):
     """
     for row, col in sudoku:
         if not filled_only or sudoku[row, col]:
-            sudoku.set_candidates(row, col, calc_candidates(sudoku, row, col))
+            sudoku.set_candidate_mask(
+                row, col, calc_candidate_mask(sudoku, row, col))
 
 
-def dlx(sudoku):
+def apply_singles(sudoku):
+    """Set naked and hidden singles, until none are left (works _in_place_).
+
+    This is a cheap constraint propagation before searching: Candidates
+    are calculated from the numbers in the sudoku and kept as bitmasks
+    (the candidates stored in the sudoku are neither used nor changed).
+    The solutions of the sudoku stay the same.
+
+    Args:
+        sudoku (Sudoku): The :class:`Sudoku` instance to change.
+
+    Returns:
+        bool: False, if a contradiction has been found (conflicting or
+              invalid numbers, a field without candidates or a number
+              without a field in a row, column or box). The sudoku has
+              no solutions in this case.
+    """
+    geo = sudoku.geometry
+    size = geo.size
+    peers, houses, houses_of = geo.peers, geo.houses, geo.houses_of
+    get_at, set_at = sudoku.get_at, sudoku.set_at
+    all_mask = (2 << size) - 2
+    cells = range(len(sudoku))
+
+    # numbers set in each house and candidates of each empty field
+    placed = [0] * len(houses)
+    masks = [0] * len(sudoku)
+
+    for i in cells:
+        value = get_at(i)
+        if value:
+            if not 0 < value <= size:
+                return False
+            bit = 1 << value
+            for h in houses_of[i]:
+                if placed[h] & bit:
+                    return False
+                placed[h] |= bit
+
+    for i in cells:
+        if not get_at(i):
+            r, c, b = houses_of[i]
+            masks[i] = all_mask & ~(placed[r] | placed[c] | placed[b])
+
+    def place(i, value):
+        bit = 1 << value
+        for h in houses_of[i]:
+            if placed[h] & bit:
+                return False
+            placed[h] |= bit
+        set_at(i, value)
+        masks[i] = 0
+        for j in peers[i]:
+            masks[j] &= ~bit
+        return True
+
+    changed = True
+    while changed:
+        changed = False
+
+        # naked singles
+        for i in cells:
+            mask = masks[i]
+            if mask and not mask & (mask - 1):
+                if not place(i, mask.bit_length() - 1):
+                    return False
+                changed = True
+            elif not mask and not get_at(i):
+                return False
+
+        # hidden singles
+        for h, house in enumerate(houses):
+            once = twice = 0
+            for i in house:
+                twice |= once & masks[i]
+                once |= masks[i]
+
+            if once | placed[h] != all_mask:
+                return False
+
+            hidden = once & ~twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in house:
+                    if masks[i] & bit:
+                        if not place(i, bit.bit_length() - 1):
+                            return False
+                        changed = True
+                        break
+
+    return True
+
+
+def dlx(sudoku, engine="sets", propagate=False):
     """Solve the sudoku using the dancing links variant of algorithm-X.
 
         Args:
             sudoku (Sudoku): The :class:`Sudoku` instance to solve.
+            engine (str): The exact cover engine to use. Either "sets"
+                          (algorithm-X using dicts of sets) or "links"
+                          (real dancing links, which is faster on large
+                          sudokus).
+            propagate (bool): Set naked and hidden singles (see
+                              apply_singles()) before searching.
 
         Yields:
             Sudoku: A solution of the sudoku.
+
+        Raises:
+            ValueError: if engine is not a valid engine name.
     """
+    try:
+        do_engine = DLX_ENGINES[engine]
+    except KeyError:
+        values = ", ".join(sorted(DLX_ENGINES))
+        raise ValueError("engine must be one of %s" % values)
+
     solution = sudoku.copy()
-    for solution in do_dlx(solution):
+    if propagate and not apply_singles(solution):
+        return
+
+    for solution in do_engine(solution):
         yield solution.copy()
 
 
+def count_solutions(sudoku, limit=None, propagate=False):
+    """Count the solutions of the sudoku.
+
+    The solutions are counted in the exact cover search, so no
+    :class:`Sudoku` instances are created for them.
+
+    Args:
+        sudoku (Sudoku): The :class:`Sudoku` instance to check.
+        limit (int): Stop counting after this number of solutions.
+                     Use None to count all solutions and limit=2
+                     to check for uniqueness.
+        propagate (bool): Set naked and hidden singles (see
+                          apply_singles()) before searching.
+
+    Returns:
+        int: The number of solutions (but not more than limit).
+    """
+    if propagate:
+        sudoku = sudoku.copy()
+        if not apply_singles(sudoku):
+            return 0
+
+    return count_links(sudoku, limit=limit)
+
+
 def bruteforce(sudoku):
     """Solve the sudoku using brute force and yield solutions.
 
@@ -87,11 +255,12 @@ def bruteforce(sudoku):
 
     # Check for conflicts, since the algorithm simply
     # returns invalid solutions otherwise.
-    for row, col in sudoku:
-        value = sudoku[row, col]
+    peers = sudoku.geometry.peers
+    for index in range(len(sudoku)):
+        value = sudoku.get_at(index)
         if value:
-            for (i, j) in sudoku.surrounding_of(row, col, include=False):
-                if sudoku[i, j] == value:
+            for i in peers[index]:
+                if sudoku.get_at(i) == value:
                     return
 
     solution = sudoku.copy()
@@ -106,29 +275,52 @@ def _do_bruteforce(sudoku):
     This is an internal function and should not be used
     outside of the solve module.
     """
-
-    sorted_empty = sorted(
-        list(sudoku.empty()), key=lambda c: len(sudoku.get_candidates(*c)))
-
-    try:
-        row, col = sorted_empty[0]
-    except IndexError:
-        yield sudoku
-        return
-
-    for candidate in list(sudoku.get_candidates(row, col)):
-        sudoku[row, col] = candidate
-
-        # save a copy of the candidates in fields, which will be changed
-        saved_candidates = {(row, col): set(sudoku.get_candidates(row, col))}
-        for (i, j) in sudoku.surrounding_of(row, col, include=False):
-            saved_candidates[(i, j)] = set(sudoku.get_candidates(i, j))
-            sudoku.remove_candidates(i, j, {candidate})
-
-        for solution in _do_bruteforce(sudoku):
-            yield solution
-
-        # revert candidate changes and continue with next candidate
-        for (i, j), value in saved_candidates.items():
-            sudoku.set_candidates(i, j, value)
-        sudoku[row, col] = 0
+    get_mask = sudoku.get_candidate_mask_at
+    set_mask = sudoku.set_candidate_mask_at
+    peers = sudoku.geometry.peers
+    cells = range(len(sudoku))
+
+    # For each level of the search we keep the field index, the
+    # candidates left to try (reversed) and the saved candidate masks
+    # of the current try (or None).
+    stack = []
+
+    while True:
+        empty = [i for i in cells if not sudoku.get_at(i)]
+        if not empty:
+            yield sudoku
+        else:
+            # the (first) field with the fewest candidates
+            index = min(empty, key=lambda i: popcount(get_mask(i)))
+            candidates = sorted(from_mask(get_mask(index)), reverse=True)
+            stack.append([index, candidates, None])
+
+        # backtrack to the next candidate to try
+        while stack:
+            level = stack[-1]
+            index, candidates, saved_masks = level
+
+            # revert candidate changes of the last try
+            if saved_masks is not None:
+                for i, mask in saved_masks:
+                    set_mask(i, mask)
+                sudoku.set_at(index, 0)
+                level[2] = None
+
+            if candidates:
+                candidate = candidates.pop()
+                sudoku.set_at(index, candidate)
+                bit = 1 << candidate
+
+                # save a copy of the candidates in fields, which will be changed
+                saved_masks = [(index, get_mask(index))]
+                for i in peers[index]:
+                    mask = get_mask(i)
+                    saved_masks.append((i, mask))
+                    set_mask(i, mask & ~bit)
+                level[2] = saved_masks
+                break
+
+            stack.pop()
+        else:
+            return
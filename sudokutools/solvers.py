@@ -28,14 +28,20 @@ Solve steps defined here:
  * Swordfish
  * Jellyfish
  * Bruteforce
+
+The work done by each solve method in solve() and hints() can be
+collected using a Profile instance and limited using a Budget instance.
 """
 
-from collections import defaultdict, namedtuple
+import json
+from collections import namedtuple
 from functools import total_ordering
-from itertools import combinations, product
+from itertools import combinations
+from timeit import default_timer
 
-from sudokutools.solve import init_candidates, calc_candidates, dlx
-from sudokutools.sudoku import Sudoku
+from sudokutools.cache import get_cache, puzzle_key
+from sudokutools.solve import init_candidates, calc_candidate_mask, dlx
+from sudokutools.sudoku import Sudoku, from_mask, popcount
 
 
 class Action(namedtuple("ActionTuple", ["func", "row", "col", "value"])):
@@ -100,6 +106,25 @@ class SolveStep(object):
 
         raise NotImplementedError("%s.find() not implemented." % cls.__name__)
 
+    @classmethod
+    def find_changed(cls, sudoku, changes):
+        """Same as find(), but skips unchanged parts of the sudoku.
+
+        Parts of the sudoku (e.g. houses), in which nothing has been found
+        and which haven't changed since then, are skipped. This yields
+        the same steps as find() (the default implementation simply
+        calls find()).
+
+        Args:
+            sudoku (Sudoku): The sudoku to solve.
+            changes (Changes): The changes of the sudoku (or None to
+                               search the whole sudoku).
+
+        Yields:
+            SolveStep: The next solve step.
+        """
+        return cls.find(sudoku)
+
     def build_actions(self, sudoku):
         raise NotImplementedError(
             "%s.build_actions() not implemented." % self.__class__.__name__)
@@ -119,16 +144,264 @@ class SolveStep(object):
             step.apply(sudoku)
 
 
+def _houses_with_empty_fields(sudoku):
+    """Yield the number and fields of all houses with empty fields.
+
+    Rows, columns and boxes are yielded in 3 steps (the empty fields
+    are searched again for each step). Within a step the houses are
+    ordered by their first empty field.
+
+    This is an internal function and should not be used
+    outside of the solvers module.
+    """
+    geo = sudoku.geometry
+    size = geo.size
+
+    for offset, houses, house_at in ((0, geo.rows, geo.row_at),
+                                     (size, geo.columns, geo.column_at),
+                                     (2 * size, geo.boxes, geo.box_at)):
+        found = []
+        for row, col in sudoku.empty():
+            h = house_at[row * size + col]
+            if h not in found:
+                found.append(h)
+
+        for h in found:
+            yield offset + h, houses[h]
+
+
+class Changes(object):
+    """Keeps track of the changes of a sudoku while solving it.
+
+    Each house (see Geometry.houses) and each candidate has a version,
+    which is increased, whenever a field in the house or the candidate
+    in any field is changed. SolveStep.find_changed() remembers the
+    versions, for which it didn't find anything in a part of the sudoku
+    and skips this part, until it changes.
+    """
+
+    def __init__(self, sudoku):
+        geo = sudoku.geometry
+        self.houses_of = geo.houses_of
+        self.houses = [0] * len(geo.houses)
+        self.candidates = [0] * (geo.size + 1)
+        self.searched = {}
+
+    def apply(self, step, sudoku):
+        """Apply the step to the sudoku and record the changes.
+
+        Returns:
+            int: The number of candidates removed by the step.
+        """
+        if not step.actions:
+            step.build_actions(sudoku)
+
+        fields = set((action.row, action.col) for action in step.actions)
+        return self.change(sudoku, fields, step.apply)
+
+    def change(self, sudoku, fields, func):
+        """Call func(sudoku) and record the changes of the given fields.
+
+        Args:
+            sudoku (Sudoku): The sudoku to change.
+            fields (iterable of (int, int)): The fields changed by func.
+            func (callable): Changes the sudoku given as only argument.
+
+        Returns:
+            int: The number of candidates removed.
+        """
+        before = [(row, col, sudoku[row, col],
+                   sudoku.get_candidate_mask(row, col))
+                  for row, col in fields]
+
+        func(sudoku)
+
+        size = sudoku.geometry.size
+        removed = 0
+        for row, col, number, mask in before:
+            changed = mask ^ sudoku.get_candidate_mask(row, col)
+            if changed or number != sudoku[row, col]:
+                for h in self.houses_of[row * size + col]:
+                    self.houses[h] += 1
+
+            removed += popcount(mask & changed)
+            while changed:
+                bit = changed & -changed
+                changed ^= bit
+                self.candidates[bit.bit_length() - 1] += 1
+
+        return removed
+
+    def version(self, houses):
+        """Return the version of the given houses."""
+        return sum(self.houses[h] for h in houses)
+
+    def unchanged(self, key, version):
+        """Return if nothing has been found for key in this version."""
+        return self.searched.get(key) == version
+
+    def nothing_found(self, key, version):
+        """Remember, that nothing has been found for key in this version."""
+        self.searched[key] = version
+
+
+class Profile(object):
+    """Collects the work done by each solve method.
+
+    Pass an instance to solve(), hints() or the functions in the
+    analyze module to profile them. A profile can be reused to
+    collect the totals of multiple calls.
+
+    For each SolveStep subclass the following is counted:
+     * calls: The number of times, the solve method has been searched.
+     * time: The time (in seconds) spent in find().
+     * found: The number of steps found.
+     * applied: The number of steps applied to the sudoku.
+     * eliminated: The number of candidates removed by the applied steps.
+    """
+
+    FIELDS = ("calls", "time", "found", "applied", "eliminated")
+
+    def __init__(self):
+        self.stats = {}
+
+    def __get(self, cls):
+        try:
+            return self.stats[cls]
+        except KeyError:
+            stats = self.stats[cls] = dict.fromkeys(self.FIELDS, 0)
+            stats["time"] = 0.0
+            return stats
+
+    def find(self, cls, steps):
+        """Yield the steps, while counting and timing them for cls."""
+        stats = self.__get(cls)
+        stats["calls"] += 1
+        steps = iter(steps)
+
+        while True:
+            start = default_timer()
+            try:
+                step = next(steps)
+            except StopIteration:
+                stats["time"] += default_timer() - start
+                return
+            stats["time"] += default_timer() - start
+            stats["found"] += 1
+            yield step
+
+    def applied(self, cls, eliminated):
+        """Count an applied step of cls, which removed some candidates."""
+        stats = self.__get(cls)
+        stats["applied"] += 1
+        stats["eliminated"] += eliminated
+
+    def as_dict(self):
+        """Return the collected numbers as dict.
+
+        Returns:
+            dict: Maps the names of the solve step classes to dicts
+                  with the keys of Profile.FIELDS.
+        """
+        return dict((cls.__name__, dict(stats))
+                    for cls, stats in self.stats.items())
+
+    def to_json(self, **kwargs):
+        """Return the collected numbers (see as_dict()) as JSON string.
+
+        Keyword arguments are passed to json.dumps().
+        """
+        kwargs.setdefault("sort_keys", True)
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+class Budget(object):
+    """Limits the time and the number of steps used by solve() or hints().
+
+    The time is measured from the creation of the budget, so a budget
+    can be shared by multiple calls. The budget is checked before each
+    search of a solve method and before each step, so it may be exceeded
+    by the duration of a single search.
+
+    Attributes:
+        seconds (float): The available time in seconds (or None).
+        steps (int): The available number of steps (or None).
+        used (int): The number of steps used so far.
+        exceeded (bool): True, if some work has been skipped, because
+                         the budget has been used up.
+    """
+
+    def __init__(self, seconds=None, steps=None):
+        self.seconds = seconds
+        self.steps = steps
+        self.used = 0
+        self.exceeded = False
+
+        if seconds is None:
+            self.deadline = None
+        else:
+            self.deadline = default_timer() + seconds
+
+    def __repr__(self):
+        return "%s(seconds=%r, steps=%r)" % (
+            self.__class__.__name__, self.seconds, self.steps)
+
+    def expired(self):
+        """Return True, if no time is left (and mark the budget exceeded)."""
+        if self.deadline is not None and default_timer() >= self.deadline:
+            self.exceeded = True
+        return self.exceeded
+
+    def spend(self):
+        """Use a single step and return True, if the budget allows it.
+
+        If the budget is used up, False is returned and the budget
+        is marked exceeded.
+        """
+        if self.expired():
+            return False
+        if self.steps is not None and self.used >= self.steps:
+            self.exceeded = True
+            return False
+
+        self.used += 1
+        return True
+
+
+def _positions(sudoku, lines):
+    """Return the positions of all candidates in the given lines.
+
+    Returns:
+        list of list of int: positions[n][i] has bit k set, if n is
+                             a candidate of the field lines[i][k].
+
+    This is an internal function and should not be used
+    outside of the solvers module.
+    """
+    get_mask = sudoku.get_candidate_mask_at
+    positions = [[0] * len(lines) for _ in range(sudoku.geometry.size + 1)]
+
+    for i, line in enumerate(lines):
+        for k, j in enumerate(line):
+            mask = get_mask(j)
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                positions[bit.bit_length() - 1][i] |= 1 << k
+
+    return positions
+
+
 class CalculateCandidates(SolveStep):
     """Calculates the candidates of fields."""
     @classmethod
     def find(cls, sudoku):
         for row, col in sudoku:
             # ignore fields with defined candidates
-            if sudoku.get_candidates(row, col):
+            if sudoku.get_candidate_mask(row, col):
                 continue
 
-            values = calc_candidates(sudoku, row, col)
+            values = from_mask(calc_candidate_mask(sudoku, row, col))
             yield cls(((row, col),), ((row, col),), values)
 
     def build_actions(self, sudoku):
@@ -167,8 +440,9 @@ class _SingleFieldStep(SolveStep):
         self.actions.append(
             Action(Sudoku.set_candidates, row, col, {value}))
 
+        bit = 1 << value
         for i, j in sudoku.surrounding_of(row, col, include=False):
-            if value in sudoku.get_candidates(i, j):
+            if sudoku.get_candidate_mask(i, j) & bit:
                 self.actions.append(
                     Action(Sudoku.remove_candidates, i, j, {value}))
 
@@ -184,11 +458,10 @@ class NakedSingle(_SingleFieldStep):
     @classmethod
     def find(cls, sudoku):
         for row, col in sudoku.empty():
-            candidates = sudoku.get_candidates(row, col)
-            if len(candidates) == 1:
-                for value in candidates:
-                    break
-                yield cls(row, col, value)
+            mask = sudoku.get_candidate_mask(row, col)
+            # exactly one bit set
+            if mask and not mask & (mask - 1):
+                yield cls(row, col, mask.bit_length() - 1)
 
 
 class HiddenSingle(_SingleFieldStep):
@@ -202,24 +475,37 @@ class HiddenSingle(_SingleFieldStep):
     """
     @classmethod
     def find(cls, sudoku):
-        yielded_coords = []
+        return cls.find_changed(sudoku, None)
+
+    @classmethod
+    def find_changed(cls, sudoku, changes):
+        geo = sudoku.geometry
+        get_mask = sudoku.get_candidate_mask_at
+        all_mask = (2 << geo.size) - 2
+        lines = (geo.columns, geo.column_at), (geo.rows, geo.row_at), \
+            (geo.boxes, geo.box_at)
 
         for row, col in sudoku.empty():
-            for f in sudoku.column_of, sudoku.row_of, sudoku.box_of:
-                found_hidden_single = False
-                candidates = set(sudoku.numbers)
-                for i, j in f(row, col, include=False):
-                    candidates -= sudoku.get_candidates(i, j)
-
-                for value in candidates:
-                    if (row, col) not in yielded_coords:
-                        yielded_coords.append((row, col))
-                        yield cls(row, col, value)
-                        found_hidden_single = True
-
-                # skip the other functions
-                if found_hidden_single:
+            index = row * geo.size + col
+            if changes:
+                key = (cls, index)
+                version = changes.version(geo.houses_of[index])
+                if changes.unchanged(key, version):
+                    continue
+
+            for houses, house_at in lines:
+                mask = all_mask
+                for i in houses[house_at[index]]:
+                    if i != index:
+                        mask &= ~get_mask(i)
+
+                # use the smallest candidate and skip the other houses
+                if mask:
+                    yield cls(row, col, (mask & -mask).bit_length() - 1)
                     break
+            else:
+                if changes:
+                    changes.nothing_found(key, version)
 
 
 class Bruteforce(_SingleFieldStep):
@@ -232,7 +518,7 @@ class Bruteforce(_SingleFieldStep):
     @classmethod
     def find(cls, sudoku):
         try:
-            solution = next(dlx(sudoku))
+            solution = next(dlx(sudoku, propagate=True))
         except StopIteration:
             return
         for row, col in sudoku.diff(solution):
@@ -259,45 +545,53 @@ class NakedTuple(SolveStep):
 
     @classmethod
     def find(cls, sudoku):
+        return cls.find_changed(sudoku, None)
+
+    @classmethod
+    def find_changed(cls, sudoku, changes):
         # keep track of yielded steps
-        yielded_coords = []
-
-        # we work through rows, cols and quads in 3 steps, since the
-        # empty fields can changed in-between
-        for func in sudoku.row_of, sudoku.column_of, sudoku.box_of:
-            clist = []
-            for (row, col) in sudoku.empty():
-                coords = func(row, col)
-                if coords not in clist:
-                    clist.append(coords)
-            for coords in clist:
-                for step in cls.__find_at(sudoku, coords):
-                    if step.clues not in yielded_coords:
-                        yielded_coords.append(step.clues)
-                        yield step
+        yielded_coords = set()
+
+        for h, house in _houses_with_empty_fields(sudoku):
+            if changes:
+                key = (cls, h)
+                version = changes.houses[h]
+                if changes.unchanged(key, version):
+                    continue
+
+            found = False
+            for step in cls.__find_at(sudoku, house):
+                found = True
+                if step.clues not in yielded_coords:
+                    yielded_coords.add(step.clues)
+                    yield step
+
+            if changes and not found:
+                changes.nothing_found(key, version)
 
     @classmethod
-    def __find_at(cls, sudoku, coords):
+    def __find_at(cls, sudoku, house):
+        coords = sudoku.geometry.coords
+        get_mask = sudoku.get_candidate_mask_at
+
         # Create a list of fields with at least 2 and at most n candidates.
         # (We ignore naked singles here, because combinations() would
         # return a very long list otherwise.)
-        n_candidates = [(row, col) for (row, col) in coords if 1 < len(
-            sudoku.get_candidates(row, col)) <= cls.n]
+        n_candidates = [i for i in house if 1 < popcount(get_mask(i)) <= cls.n]
 
         for fields in combinations(n_candidates, cls.n):
-            all_candidates = set()
-            for (row, col) in fields:
-                all_candidates |= sudoku.get_candidates(row, col)
+            mask = 0
+            for i in fields:
+                mask |= get_mask(i)
 
-            if len(all_candidates) <= cls.n:
+            if popcount(mask) <= cls.n:
                 # Naked Tuple found - only yield, if actions can be applied.
-                affected = [(r, c) for r, c in coords if (r, c) not in fields
-                            and set(all_candidates)& sudoku.get_candidates(r, c)]
+                affected = [coords[i] for i in house
+                            if i not in fields and get_mask(i) & mask]
 
                 if affected:
-                    step = cls(
-                        clues=fields, affected=affected, values=all_candidates)
-                    yield step
+                    yield cls(clues=[coords[i] for i in fields],
+                              affected=affected, values=from_mask(mask))
 
 
 NakedPair = type("NakedPair", (NakedTuple,), dict(n=2))
@@ -325,48 +619,55 @@ class HiddenTuple(SolveStep):
 
     @classmethod
     def find(cls, sudoku):
-        # keep track of yielded steps
-        yielded_coords = []
-
-        # we work through rows, cols and quads in 3 steps, since the
-        # empty fields can changed in-between
-        for func in sudoku.row_of, sudoku.column_of, sudoku.box_of:
-            clist = []
-            for (i, j) in sudoku.empty():
-                coords = func(i, j)
-                if coords not in clist:
-                    clist.append(coords)
-            for coords in clist:
-                for step in cls.__find_at(sudoku, coords):
-                    yield step
+        return cls.find_changed(sudoku, None)
 
     @classmethod
-    def __find_at(cls, sudoku, coords):
-        cand_coords = defaultdict(lambda: set())
+    def find_changed(cls, sudoku, changes):
+        for h, house in _houses_with_empty_fields(sudoku):
+            if changes:
+                key = (cls, h)
+                version = changes.houses[h]
+                if changes.unchanged(key, version):
+                    continue
 
-        # build coordinate list for each candidate
-        for cand in sudoku.numbers:
-            for (row, col) in coords:
-                if cand in sudoku.get_candidates(row, col):
-                    cand_coords[cand].add((row, col))
+            found = False
+            for step in cls.__find_at(sudoku, house):
+                found = True
+                yield step
+
+            if changes and not found:
+                changes.nothing_found(key, version)
+
+    @classmethod
+    def __find_at(cls, sudoku, house):
+        coords = sudoku.geometry.coords
+        get_mask = sudoku.get_candidate_mask_at
+        clues = [coords[i] for i in house]
+        positions = [p[0] for p in _positions(sudoku, (house, ))]
 
         # create a list of numbers with at most n occurrences
-        n_times = [c for c in sudoku.numbers if 1 < len(cand_coords[c]) <= cls.n]
+        n_times = [c for c in sudoku.numbers
+                   if 1 < popcount(positions[c]) <= cls.n]
 
         # select n numbers from the n_times list
         for numbers in combinations(n_times, cls.n):
-            max_set = set()
+            max_set = 0
             for num in numbers:
-                max_set |= cand_coords[num]
+                max_set |= positions[num]
+
+            if popcount(max_set) <= cls.n:
+                fields = [i for k, i in enumerate(house) if max_set >> k & 1]
+                others = ~sum(1 << num for num in numbers)
 
-            if len(max_set) <= cls.n:
-                # hidden tuple found - only yield, if there are actions to apply
-                for (row, col) in max_set:
-                    affected = [(r, c) for r, c in max_set
-                                if sudoku.get_candidates(r, c) - set(numbers)]
+                # hidden tuple found - only yield, if there are actions to
+                # apply (which is checked again for each field, since the
+                # step may have been applied in-between).
+                for _ in fields:
+                    affected = [coords[i] for i in fields
+                                if get_mask(i) & others]
 
                     if affected:
-                        yield cls(clues=coords, affected=affected, values=numbers)
+                        yield cls(clues=clues, affected=affected, values=numbers)
 
 HiddenPair = type("HiddenPair", (HiddenTuple,), dict(n=2))
 HiddenTriple = type("HiddenTriple", (HiddenTuple,), dict(n=3))
@@ -379,53 +680,93 @@ class PointingTuple(SolveStep):
 
     @classmethod
     def find(cls, sudoku):
+        return cls.find_changed(sudoku, None)
+
+    @classmethod
+    def find_changed(cls, sudoku, changes):
+        geo = sudoku.geometry
+        size = geo.size
+        houses_of = geo.houses_of
+
         # reducing row or column candidates
         for box in sudoku.indices:
-            for step in cls.__find_in_box(sudoku, box):
+            row = (box // sudoku.box_height) * sudoku.box_height
+            col = (box % sudoku.box_height) * sudoku.box_width
+            box = geo.box_at[row * size + col]
+            fields = geo.boxes[box]
+
+            # the box and all rows and columns crossing it
+            houses = set(h for i in fields for h in houses_of[i])
+            for step in cls.__find_changed(
+                    sudoku, changes, (cls, "box", box), houses,
+                    cls.__find_in_box(sudoku, fields)):
                 yield step
 
         # reducing box candidates
         for x in sudoku.indices:
-            for step in cls.__find_in_row_and_column(sudoku, x):
-                yield step
+            for kind, line in ("row", geo.rows[x]), ("column", geo.columns[x]):
+                # the line and all boxes crossing it
+                houses = set(houses_of[i][2] for i in line)
+                houses.add(houses_of[line[0]][0] if kind == "row"
+                           else houses_of[line[0]][1])
+                for step in cls.__find_changed(
+                        sudoku, changes, (cls, kind, x), houses,
+                        cls.__find_in_line(sudoku, line)):
+                    yield step
 
     @classmethod
-    def __find_in_row_and_column(cls, sudoku, x):
-        for f in sudoku.row_of, sudoku.column_of:
-            coords = f(x, x)
+    def __find_changed(cls, sudoku, changes, key, houses, steps):
+        """Yield steps, unless the houses are unchanged for key."""
+        if changes:
+            version = changes.version(houses)
+            if changes.unchanged(key, version):
+                return
+
+        found = False
+        for step in steps:
+            found = True
+            yield step
 
-            for candidate in sudoku.numbers:
-                clues = [(r, c) for r, c in coords
-                         if candidate in sudoku.get_candidates(r, c)]
+        if changes and not found:
+            changes.nothing_found(key, version)
 
-                # skip, if this doesn't have the correct number of fields
-                # (e.g. we have a pair, but want a triple)
-                if len(clues) != cls.n:
-                    continue
+    @classmethod
+    def __find_in_line(cls, sudoku, line):
+        geo = sudoku.geometry
+        coords = geo.coords
+        get_mask = sudoku.get_candidate_mask_at
+        box_at = geo.box_at
 
-                # if all fields with this candidate lie in the same
-                # box, remove this candidate from all other fields
-                # in the box
-                if len(set([sudoku.box_at(r, c) for r, c in clues])) == 1:
-                    affected = [(r, c) for r, c in sudoku.box_of(*clues[0])
-                                if (r, c) not in clues
-                                and candidate in sudoku.get_candidates(r, c)]
+        for candidate in sudoku.numbers:
+            bit = 1 << candidate
+            clues = [i for i in line if get_mask(i) & bit]
 
-                    if affected:
-                        yield cls(
-                            clues=clues, affected=affected, values=(candidate,))
+            # skip, if this doesn't have the correct number of fields
+            # (e.g. we have a pair, but want a triple)
+            if len(clues) != cls.n:
+                continue
 
+            # if all fields with this candidate lie in the same
+            # box, remove this candidate from all other fields
+            # in the box
+            box = box_at[clues[0]]
+            if all(box_at[i] == box for i in clues):
+                affected = [coords[i] for i in geo.boxes[box]
+                            if i not in clues and get_mask(i) & bit]
 
-    @classmethod
-    def __find_in_box(cls, sudoku, box):
-        row = (box // sudoku.box_height) * sudoku.box_height
-        col = (box % sudoku.box_height) * sudoku.box_width
+                if affected:
+                    yield cls(clues=[coords[i] for i in clues],
+                              affected=affected, values=(candidate,))
 
-        box_coords = sudoku.box_of(row, col)
+    @classmethod
+    def __find_in_box(cls, sudoku, box_fields):
+        geo = sudoku.geometry
+        coords = geo.coords
+        get_mask = sudoku.get_candidate_mask_at
 
         for candidate in sudoku.numbers:
-            clues = [(r, c) for r, c in box_coords
-                     if candidate in sudoku.get_candidates(r, c)]
+            bit = 1 << candidate
+            clues = [i for i in box_fields if get_mask(i) & bit]
 
             # skip, if this doesn't have the correct number of fields
             # (e.g. we have a pair, but want a triple)
@@ -434,23 +775,24 @@ class PointingTuple(SolveStep):
 
             # if all fields with this candidate lie in the same row
             # remove this candidate from all other fields in the same row
-            if len(set([r for r, c in clues])) == 1:
-                affected = [(r, c) for r, c in sudoku.row_of(*clues[0])
-                            if (r, c) not in clues
-                            and candidate in sudoku.get_candidates(r, c)]
+            row = geo.row_at[clues[0]]
+            col = geo.column_at[clues[0]]
+            if all(geo.row_at[i] == row for i in clues):
+                line = geo.rows[row]
 
             # if all fields with this candidate lie in the same column
             # remove this candidate from all other fields in the same column
-            elif len(set([c for r, c in clues])) == 1:
-                affected = [(r, c) for r, c in sudoku.column_of(*clues[0])
-                            if (r, c) not in clues
-                            and candidate in sudoku.get_candidates(r, c)]
+            elif all(geo.column_at[i] == col for i in clues):
+                line = geo.columns[col]
             else:
-                affected = []
+                line = ()
+
+            affected = [coords[i] for i in line
+                        if i not in clues and get_mask(i) & bit]
 
             if affected:
-                yield cls(
-                    clues=clues, affected=affected, values=(candidate,))
+                yield cls(clues=[coords[i] for i in clues],
+                          affected=affected, values=(candidate,))
 
     def build_actions(self, sudoku):
         val = self.values[0]
@@ -468,51 +810,76 @@ class BasicFish(SolveStep):
 
     @classmethod
     def find(cls, sudoku):
-        variants = ((0, sudoku.row_of, sudoku.column_of),
-                    (1, sudoku.column_of, sudoku.row_of))
+        return cls.find_changed(sudoku, None)
 
-        for item, candidate in product(variants, sudoku.numbers):
-            for step in cls.__find_for_candidate(sudoku, candidate, *item):
-                yield step
+    @classmethod
+    def find_changed(cls, sudoku, changes):
+        geo = sudoku.geometry
+        variants = ((geo.rows, geo.columns), (geo.columns, geo.rows))
+
+        for variant, (base_lines, cover_lines) in enumerate(variants):
+            # Steps for a candidate only change the positions of this
+            # candidate, so they can be calculated once for all candidates.
+            positions = None
+
+            for candidate in sudoku.numbers:
+                # a fish only depends on the fields with its candidate
+                if changes:
+                    key = (cls, variant, candidate)
+                    version = changes.candidates[candidate]
+                    if changes.unchanged(key, version):
+                        continue
+
+                if positions is None:
+                    positions = _positions(sudoku, base_lines)
+
+                found = False
+                for step in cls.__find_for_candidate(
+                        sudoku, candidate, base_lines, cover_lines,
+                        positions[candidate]):
+                    found = True
+                    yield step
+
+                if changes and not found:
+                    changes.nothing_found(key, version)
 
     @classmethod
     def __find_for_candidate(
-            cls, sudoku, candidate, offset, base_func, cover_func):
-
-        # fields with this candidate, keyed by their index.
-        fields = {}
-        for i in sudoku.indices:
-            fields[i] = [(r, c) for r, c in base_func(i, i)
-                         if candidate in sudoku.get_candidates(r, c)]
+            cls, sudoku, candidate, base_lines, cover_lines, positions):
+        coords = sudoku.geometry.coords
+        get_mask = sudoku.get_candidate_mask_at
+        bit = 1 << candidate
 
-        valid_indices = [i for i in fields if 2 <= len(fields[i]) <= cls.n]
+        valid_indices = [i for i, mask in enumerate(positions)
+                         if 2 <= popcount(mask) <= cls.n]
 
         for indices in combinations(valid_indices, cls.n):
-            base_fields = []
+            # the cover lines used at least once and at least twice
+            once = twice = 0
             for i in indices:
-                base_fields.extend(fields[i])
-
-            other_counts = defaultdict(lambda: 0)
-            other_offset = (offset + 1) % 2
-            for coord in base_fields:
-                other_counts[coord[other_offset]] += 1
+                twice |= once & positions[i]
+                once |= positions[i]
 
             # The other coordinate only appears once,
             # so this is not a valid fish
-            if min(other_counts.values()) < 2:
+            if once != twice:
                 continue
             # There are more than cls.n other coordinates,
             # so this is not a valid fish
-            if len(other_counts) > cls.n:
+            if popcount(once) > cls.n:
                 continue
 
-            covered = []
-            for val in other_counts:
-                covered.extend(cover_func(val, val))
+            base_fields = [coords[j] for i in indices
+                           for k, j in enumerate(base_lines[i])
+                           if positions[i] >> k & 1]
 
-            affected = [(r, c) for r, c in covered
-                        if (r, c) not in base_fields
-                        and candidate in sudoku.get_candidates(r, c)]
+            # all fields of the cover lines, which are not in base lines
+            affected = []
+            for k in range(len(cover_lines)):
+                if once >> k & 1:
+                    affected.extend(
+                        coords[j] for n, j in enumerate(cover_lines[k])
+                        if n not in indices and get_mask(j) & bit)
 
             if affected:
                 yield cls(
@@ -553,29 +920,101 @@ SOLVERS = [
     Bruteforce,
 ]
 
+_SOLVERS_BY_NAME = dict((cls.__name__, cls) for cls in SOLVERS)
+
 
-def solve(sudoku, report=lambda step: None):
+def solve(sudoku, report=lambda step: None, profile=None, solvers=None,
+          budget=None):
     """Solve the sudoku and return the solution.
 
     Args:
         sudoku (Sudoku): The sudoku to solve.
         report (callable): A function taking a single argument (the current
                            step), which can be used as a callback.
+        profile (Profile): Collect the work done by each solve method
+                           in this profile.
+        solvers (list of SolveStep subclasses): The solve methods to use
+                                                (in this order). Defaults
+                                                to SOLVERS.
+        budget (Budget): Stop solving, when this budget is used up.
 
     Returns:
-        Sudoku: The solution of the sudoku.
+        Sudoku: The solution of the sudoku. If the given solvers can't
+                solve the sudoku or budget.exceeded is True, this is
+                the partially solved sudoku.
+
+    After each step the solve methods are tried again in the given order.
+    Houses and candidates, which haven't changed since a solve method
+    has found nothing in them, are skipped (see Changes).
+
+    Note:
+        If solvers doesn't start with CalculateCandidates, the empty
+        fields of the sudoku should have candidates already.
+
+    If a cache is set (see cache.set_cache()) and profile, solvers and
+    budget are None, the solution and the steps are looked up in and
+    stored in the cache. Steps from the cache are reported without
+    actions.
     """
+    cache = get_cache()
+    custom = profile is not None or solvers is not None or budget is not None
+    if cache is None or custom:
+        return _solve(sudoku, report, profile, solvers, budget)
+
+    key = puzzle_key(sudoku)
+    record = cache.get(key)
+    if record is not None and "solution" in record:
+        for name, clues, affected, values in record["trace"]:
+            report(_load_step(name, clues, affected, values))
+        return _load_solution(sudoku, record["solution"])
+
+    trace = []
+
+    def report_and_trace(step):
+        trace.append([step.__class__.__name__,
+                      step.clues, step.affected, step.values])
+        report(step)
+
+    solution = _solve(sudoku, report_and_trace, None, None, None)
+    cache.update(key, solution={
+        "numbers": [solution.get_at(i) for i in range(len(solution))],
+        "candidates": [solution.get_candidate_mask_at(i)
+                       for i in range(len(solution))]}, trace=trace)
+    return solution
+
+
+def _solve(sudoku, report, profile, solvers, budget):
+    """Solve the sudoku like solve() without using the cache.
+
+    This is an internal function and should not be used
+    outside of the solvers module.
+    """
+    if solvers is None:
+        solvers = SOLVERS
 
     solution = sudoku.copy()
     init_candidates(solution, filled_only=True)
+    changes = Changes(solution)
 
     while True:
-        for cls in SOLVERS:
+        for cls in solvers:
+            if budget is not None and budget.expired():
+                return solution
+
             count = 0
 
-            for step in cls.find(solution):
+            steps = cls.find_changed(solution, changes)
+            if profile is not None:
+                steps = profile.find(cls, steps)
+
+            for step in steps:
+                if budget is not None and not budget.spend():
+                    return solution
+
                 report(step)
-                step.apply(solution)
+                eliminated = changes.apply(step, solution)
+                if profile is not None:
+                    profile.applied(cls, eliminated)
                 count += 1
 
             if count > 0:
@@ -586,17 +1025,152 @@ def solve(sudoku, report=lambda step: None):
     return solution
 
 
-def hints(sudoku):
+def _load_step(name, clues, affected, values):
+    """Return the solve step stored in a trace of solve().
+
+    This is an internal function and should not be used
+    outside of the solvers module.
+    """
+    cls = _SOLVERS_BY_NAME[name]
+    step = cls.__new__(cls)
+    SolveStep.__init__(step, [tuple(c) for c in clues],
+                       [tuple(c) for c in affected], values)
+    return step
+
+
+def _load_solution(sudoku, stored):
+    """Return the solution stored by solve() for the sudoku.
+
+    This is an internal function and should not be used
+    outside of the solvers module.
+    """
+    solution = Sudoku(box_size=sudoku.box_size)
+    for i, value in enumerate(stored["numbers"]):
+        solution.set_at(i, value)
+    for i, mask in enumerate(stored["candidates"]):
+        solution.set_candidate_mask_at(i, mask)
+    return solution
+
+
+class HintEngine(object):
+    """Yields hints for a sudoku, which is changed between the hints.
+
+    The engine keeps its own copy of the sudoku and remembers, where
+    it didn't find any steps (see Changes), so after a change only the
+    changed houses and candidates are searched again.
+
+    Usage::
+
+        engine = HintEngine(sudoku)
+        step = engine.next_hint()
+        # change the sudoku using an action (e.g. actions.SetNumber)
+        engine.apply(action)
+        # or change the sudoku in any way and tell the engine
+        engine.update(sudoku)
+        step = engine.next_hint()
+    """
+
+    def __init__(self, sudoku, solvers=None):
+        """Create a new hint engine for sudoku.
+
+        Args:
+            sudoku (Sudoku): The sudoku to give hints for (including
+                             its candidates).
+            solvers (list of SolveStep subclasses): The solve methods to use
+                                                    (see hints()).
+        """
+        if solvers is None:
+            solvers = SOLVERS
+
+        self.solvers = [cls for cls in solvers if cls != Bruteforce]
+        self.sudoku = sudoku.copy(include_candidates=True)
+        self.changes = Changes(self.sudoku)
+        self.__hints = None
+
+    def apply(self, action):
+        """Apply an action to the sudoku of the engine.
+
+        Args:
+            action (callable): An action from the actions module
+                               (SetNumber or RemoveCandidates) or any
+                               callable changing a sudoku, which has
+                               the changed coordinates as attribute
+                               coordinates.
+        """
+        self.changes.change(self.sudoku, action.coordinates, action)
+        self.__hints = None
+
+    def update(self, sudoku):
+        """Change the sudoku of the engine to be equal to sudoku.
+
+        Only fields, which have been changed (numbers or candidates),
+        are searched again.
+        """
+        own = self.sudoku
+        fields = [own.geometry.coords[i] for i in range(len(own))
+                  if own.get_at(i) != sudoku.get_at(i) or
+                  own.get_candidate_mask_at(i) !=
+                  sudoku.get_candidate_mask_at(i)]
+
+        if fields:
+            self.changes.change(own, fields, lambda own: self.__copy(
+                sudoku, fields))
+            self.__hints = None
+
+    def __copy(self, sudoku, fields):
+        for row, col in fields:
+            self.sudoku[row, col] = sudoku[row, col]
+            self.sudoku.set_candidate_mask(
+                row, col, sudoku.get_candidate_mask(row, col))
+
+    def next_hint(self):
+        """Return the next hint for the current sudoku.
+
+        Returns:
+            SolveStep: The next step, which is available, or None, if
+                       all available steps have been returned since the
+                       last change.
+        """
+        if self.__hints is None:
+            self.__hints = self.__search()
+        return next(self.__hints, None)
+
+    def __search(self):
+        for cls in self.solvers:
+            for step in cls.find_changed(self.sudoku, self.changes):
+                yield step
+
+
+def hints(sudoku, profile=None, solvers=None, budget=None):
     """Yield all available solve steps for the current state of a sudoku.
 
     Args:
         sudoku (Sudoku): The sudoku to get hints for.
+        profile (Profile): Collect the work done by each solve method
+                           in this profile.
+        solvers (list of SolveStep subclasses): The solve methods to use
+                                                (in this order). Defaults
+                                                to SOLVERS. Bruteforce is
+                                                always skipped.
+        budget (Budget): Stop yielding steps, when this budget is used up.
+                         Each yielded step uses one step of the budget.
 
     Yields:
         SolveStep: A step available for the given sudoku in the current state.
     """
-    for solver in SOLVERS:
+    if solvers is None:
+        solvers = SOLVERS
+
+    for solver in solvers:
         if solver == Bruteforce:
             continue
-        for step in solver.find(sudoku):
+        if budget is not None and budget.expired():
+            return
+
+        steps = solver.find(sudoku)
+        if profile is not None:
+            steps = profile.find(solver, steps)
+        for step in steps:
+            if budget is not None and not budget.spend():
+                return
             yield step
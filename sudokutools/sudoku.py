@@ -5,11 +5,17 @@ Classes defined here:
 
 Functions defined here:
  * view(): Return sudoku (with candidates) as a human-readable string.
+ * to_mask(): Return the bitmask representing a set of candidates.
+ * from_mask(): Return the set of candidates represented by a bitmask.
+ * popcount(): Return the number of candidates in a bitmask.
 """
 
-from itertools import product
+import io
+from array import array
 from string import whitespace
 
+from sudokutools.coordinates import geometry
+
 
 class Sudoku(object):
     """Represents a sudoku.
@@ -19,17 +25,33 @@ class Sudoku(object):
     9x9 fields and the numbers and candidates within these fields.
 
     Coordinates for row and column access are values from 0 to 8 (including).
-    Using other values will most likely raise an IndexError (even though
-    negative numbers are supported, they should not be used).
+    Using other values raises an IndexError.
 
     Overview:
 
     Data access (read, write):
      * __getitem__()
      * __setitem__()
+     * get_at()
+     * set_at()
      * get_candidates()
      * set_candidates()
      * remove_candidates()
+     * get_candidate_mask()
+     * set_candidate_mask()
+     * remove_candidate_mask()
+     * get_candidate_mask_at()
+     * set_candidate_mask_at()
+
+    Candidates are stored as integer bitmasks (one int per field, bit n
+    set meaning that n is a candidate). get_candidates() and friends
+    convert from and to sets, while the *_mask() methods give direct
+    access to the stored bitmasks.
+
+    Numbers are stored in a single flat array, in which the field
+    (row, col) has the index row * N + col (N being the number of
+    fields in a row). get_at() and set_at() allow direct access
+    using this index.
 
     Copying:
      * copy()
@@ -38,14 +60,20 @@ class Sudoku(object):
      * empty()
      * __len__()
      * __eq__()
+     * __hash__()
+     * key()
      * diff()
 
     Printing:
      * __str__()
      * encode()
+     * encode_many()
+     * write_many()
 
     Parsing:
      * decode()
+     * decode_plain()
+     * decode_many()
     """
 
     def __init__(self, box_size=(3, 3)):
@@ -57,22 +85,25 @@ class Sudoku(object):
         """
         try:
             self.box_size = tuple(box_size)
-            self.box_width, self.box_height = box_size
-            self.indices = tuple(range(box_size[0] * box_size[1]))
-            self.numbers = tuple(range(1, box_size[0] * box_size[1] + 1))
+            self.box_width, self.box_height = self.box_size
+            self.geometry = geometry(self.box_width, self.box_height)
         except (IndexError, KeyError):
             raise ValueError("Invalid sudoku box_size: %s" % box_size)
-        self.__numbers = [[0] * len(self.indices) for _ in self.indices]
-        self.__candidates = [[frozenset()] * len(self.indices)
-                             for _ in self.indices]
+        self.indices = self.geometry.indices
+        self.numbers = self.geometry.numbers
+        self.__size = self.geometry.size
+
+        # A signed long is used (and not the smallest type for N), since
+        # fields may be (temporarily) set to values outside of 0..N.
+        self.__numbers = array("l", [0]) * (self.__size ** 2)
+        self.__candidates = [0] * (self.__size ** 2)
 
     def __iter__(self):
         """Iterate through all coordinates of the sudoku.
 
         Yields: (int, int): row and column of each field.
         """
-        for row, col in product(self.indices, repeat=2):
-            yield (row, col)
+        return iter(self.geometry.coords)
 
     def empty(self):
         """Iterate through the coordinates of all empty fields.
@@ -80,9 +111,10 @@ class Sudoku(object):
         Yields:
             (int, int): row and column of the next empty field.
         """
-        for row, col in self:
-            if not self.__numbers[row][col]:
-                yield row, col
+        size = self.__size
+        for i, value in enumerate(self.__numbers):
+            if not value:
+                yield divmod(i, size)
 
     def filled(self):
         """Iterate through the coordinates of filled fields.
@@ -90,9 +122,10 @@ class Sudoku(object):
         Yields:
             (int, int): row and column of the next filled field.
         """
-        for row, col in self:
-            if self.__numbers[row][col]:
-                yield row, col
+        size = self.__size
+        for i, value in enumerate(self.__numbers):
+            if value:
+                yield divmod(i, size)
 
     def count(self):
         """Return the number of filled fields.
@@ -100,7 +133,7 @@ class Sudoku(object):
         Returns:
             int: number of filled fields.
         """
-        return len(list(self.filled()))
+        return len(self.__numbers) - self.__numbers.count(0)
 
     def diff(self, other):
         """Iterate through coordinates with different values in other.
@@ -131,16 +164,24 @@ class Sudoku(object):
             Sudoku: The new sudoku instance.
         """
         sudoku = Sudoku(box_size=self.box_size)
-        for row, col in self:
-            sudoku[row, col] = self[row, col]
+        sudoku.__numbers = self.__numbers[:]
 
         if include_candidates:
-            for row, col in self:
-                c = self.get_candidates(row, col)
-                sudoku.set_candidates(row, col, c)
+            sudoku.__candidates = self.__candidates[:]
 
         return sudoku
 
+    def __getstate__(self):
+        """Return the state for pickling (without the shared geometry)."""
+        return self.box_size, self.__numbers, self.__candidates
+
+    def __setstate__(self, state):
+        """Restore the state returned by __getstate__()."""
+        box_size, numbers, candidates = state
+        self.__init__(box_size=box_size)
+        self.__numbers = numbers
+        self.__candidates = candidates
+
     def __eq__(self, other):
         """Return if other is equal in all fields.
 
@@ -153,6 +194,9 @@ class Sudoku(object):
             bool: True, if all fields are equal and false if not or other
                   is an incompatible type.
         """
+        if isinstance(other, Sudoku) and other.__size == self.__size:
+            return self.__numbers == other.__numbers
+
         try:
             for row, col in self:
                 if self[row, col] != other[row, col]:
@@ -161,6 +205,27 @@ class Sudoku(object):
         except (IndexError, KeyError, TypeError):
             return False
 
+    def __hash__(self):
+        """Return a hash of the numbers (equal sudokus have equal hashes).
+
+        Note:
+            The hash changes with the numbers, so a sudoku must not be
+            changed, while it's used in a set or as key of a dict.
+        """
+        return hash(tuple(self.__numbers))
+
+    def key(self):
+        """Return a hashable key of the box size and the numbers.
+
+        Two sudokus have the same key, if they have the same box size
+        and the same numbers (candidates are ignored). See
+        analyze.canonical() to compare sudokus, which are equivalent.
+
+        Returns:
+            tuple: The key.
+        """
+        return self.box_size, tuple(self.__numbers)
+
     def __str__(self):
         """Return sudoku as a human-readable string.
 
@@ -183,7 +248,10 @@ class Sudoku(object):
             IndexError: if the given coordinates are not valid.
         """
         row, col = key
-        return self.__numbers[row][col]
+        size = self.__size
+        if not (0 <= row < size and 0 <= col < size):
+            raise IndexError("Invalid coordinates: (%s, %s)" % (row, col))
+        return self.__numbers[row * size + col]
 
     def __setitem__(self, key, value):
         """Set the number in the field referenced by key to value.
@@ -198,7 +266,17 @@ class Sudoku(object):
             IndexError: if the given coordinates are not valid.
         """
         row, col = key
-        self.__numbers[row][col] = value
+        size = self.__size
+        if not (0 <= row < size and 0 <= col < size):
+            raise IndexError("Invalid coordinates: (%s, %s)" % (row, col))
+        self.__numbers[row * size + col] = value
+
+    def __index(self, row, col):
+        """Return the flat index of (row, col) or raise IndexError."""
+        size = self.__size
+        if not (0 <= row < size and 0 <= col < size):
+            raise IndexError("Invalid coordinates: (%s, %s)" % (row, col))
+        return row * size + col
 
     def __len__(self):
         """Return the number of fields in this sudoku.
@@ -208,6 +286,27 @@ class Sudoku(object):
         """
         return self.box_width ** 2 * self.box_height ** 2
 
+    def get_at(self, i):
+        """Return the number in the field with the flat index i.
+
+        Args:
+            i (int): The index of the field (row * N + col).
+
+        Returns:
+            int: The number in the given field, 0 representing an empty field.
+        """
+        return self.__numbers[i]
+
+    def set_at(self, i, value):
+        """Set the number in the field with the flat index i to value.
+
+        Args:
+            i (int): The index of the field (row * N + col).
+            value (int): The number to set the field to,
+                         0 representing an empty field.
+        """
+        self.__numbers[i] = value
+
     def get_number(self, row, col):
         """Same as sudoku[row, col]."""
         return self[row, col]
@@ -226,7 +325,7 @@ class Sudoku(object):
         Returns:
             frozenset: The candidates at (row, col).
         """
-        return self.__candidates[row][col]
+        return from_mask(self.__candidates[self.__index(row, col)])
 
     def set_candidates(self, row, col, value):
         """Set the candidates of the field at (row, col) to value.
@@ -236,8 +335,7 @@ class Sudoku(object):
             col (int): The column of the field.
             value (iterable): The candidates to set the field to.
         """
-
-        self.__candidates[row][col] = frozenset(value)
+        self.__candidates[self.__index(row, col)] = to_mask(value)
 
     def remove_candidates(self, row, col, value):
         """Remove the given candidates in the field at (row, col).
@@ -249,7 +347,63 @@ class Sudoku(object):
             col (int): The column of the field.
             value (iterable): The candidates to remove.
         """
-        self.__candidates[row][col] -= set(value)
+        self.__candidates[self.__index(row, col)] &= ~to_mask(value)
+
+    def get_candidate_mask(self, row, col):
+        """Return the candidates of the field at (row, col) as bitmask.
+
+        Args:
+            row (int): The row of the field.
+            col (int): The column of the field.
+
+        Returns:
+            int: The candidates at (row, col) (bit n is set, if n is
+                 a candidate).
+        """
+        return self.__candidates[self.__index(row, col)]
+
+    def set_candidate_mask(self, row, col, mask):
+        """Set the candidates of the field at (row, col) to the bitmask.
+
+        Args:
+            row (int): The row of the field.
+            col (int): The column of the field.
+            mask (int): The candidates to set the field to.
+        """
+        self.__candidates[self.__index(row, col)] = mask
+
+    def remove_candidate_mask(self, row, col, mask):
+        """Remove the candidates given as bitmask in the field at (row, col).
+
+        Ignores candidates, which are not present in the field.
+
+        Args:
+            row (int): The row of the field.
+            col (int): The column of the field.
+            mask (int): The candidates to remove.
+        """
+        self.__candidates[self.__index(row, col)] &= ~mask
+
+    def get_candidate_mask_at(self, i):
+        """Return the candidates of the field with flat index i as bitmask.
+
+        Args:
+            i (int): The index of the field (row * N + col).
+
+        Returns:
+            int: The candidates of the field (bit n is set, if n is
+                 a candidate).
+        """
+        return self.__candidates[i]
+
+    def set_candidate_mask_at(self, i, mask):
+        """Set the candidates of the field with flat index i to the bitmask.
+
+        Args:
+            i (int): The index of the field (row * N + col).
+            mask (int): The candidates to set the field to.
+        """
+        self.__candidates[i] = mask
 
     def encode(self, row_sep="", col_sep="", include_candidates=False):
         """Return sudoku as a (machine-readable) string.
@@ -268,24 +422,112 @@ class Sudoku(object):
 
         For examples of default output string see decode().
         """
-        rows = []
-        for row in self.indices:
-            numbers = [str(self[row, col]) for col in self.indices]
-            rows.append(col_sep.join(numbers))
+        digits = None
+        if not row_sep and not col_sep:
+            digits = self.__digits()
+
+        if digits is not None:
+            s = digits.decode("ascii")
+        else:
+            rows = []
+            for row in self.indices:
+                numbers = [str(self[row, col]) for col in self.indices]
+                rows.append(col_sep.join(numbers))
 
-        s = row_sep.join(rows)
+            s = row_sep.join(rows)
 
         if include_candidates:
-            all_candidates = []
+            s += "|" + self.__encode_candidates()
 
-            for row, col in self:
-                clist = list(self.get_candidates(row, col))
-                cstr = "".join([str(i) for i in sorted(clist)])
-                all_candidates.append(cstr)
+        return s
 
-            s += "|" + ",".join(all_candidates)
+    def __digits(self):
+        """Return the numbers as bytes of digits.
 
-        return s
+        Returns:
+            bytes: One digit per field or None, if a field isn't 0..9.
+        """
+        try:
+            digits = bytes(bytearray(self.__numbers.tolist()))
+        except ValueError:
+            return None
+
+        digits = digits.translate(_DIGITS)
+        return None if b"\xff" in digits else digits
+
+    def __encode_candidates(self):
+        """Return the candidates as encoded by encode() (without "|")."""
+        strings = _CANDIDATE_STRINGS
+        if len(strings) >= _MASK_CACHE_SIZE:
+            strings.clear()
+
+        encoded = []
+        for mask in self.__candidates:
+            try:
+                encoded.append(strings[mask])
+            except KeyError:
+                value = strings[mask] = "".join(
+                    [str(i) for i in sorted(from_mask(mask))])
+                encoded.append(value)
+
+        return ",".join(encoded)
+
+    @classmethod
+    def encode_many(cls, sudokus, include_candidates=False):
+        """Encode each sudoku (like encode() without separators).
+
+        Args:
+            sudokus (iterable of Sudoku): The sudokus to encode.
+            include_candidates (bool): Whether to encode candidates as well.
+
+        Yields:
+            str: The encoded sudokus.
+        """
+        for sudoku in sudokus:
+            yield sudoku.encode(include_candidates=include_candidates)
+
+    @classmethod
+    def write_many(cls, f, sudokus, include_candidates=False,
+                   buffer_size=1 << 16):
+        """Write each sudoku encoded (like encode_many()) as line to f.
+
+        The lines are collected in a buffer of bytes, which is written
+        to f, when it's full. Text files get the buffer as str, so their
+        encoding and newline translation apply.
+
+        Args:
+            f (file): The (binary or text) file to write to.
+            sudokus (iterable of Sudoku): The sudokus to write.
+            include_candidates (bool): Whether to write candidates as well.
+            buffer_size (int): The number of bytes to collect before
+                               writing them to f.
+
+        Returns:
+            int: The number of sudokus written.
+        """
+        text = isinstance(f, io.TextIOBase)
+
+        buf = bytearray()
+        count = 0
+        for sudoku in sudokus:
+            digits = sudoku.__digits()
+            if digits is None:
+                buf += sudoku.encode().encode("ascii")
+            else:
+                buf += digits
+            if include_candidates:
+                buf += b"|"
+                buf += sudoku.__encode_candidates().encode("ascii")
+            buf += b"\n"
+            count += 1
+
+            if len(buf) >= buffer_size:
+                f.write(buf.decode("ascii") if text else buf)
+                del buf[:]
+
+        if buf:
+            f.write(buf.decode("ascii") if text else buf)
+        return count
 
     @classmethod
     def decode(cls, s, empty="0", number_sep=None, sudoku_sep="|", candidate_sep=",", box_size=None):
@@ -338,6 +580,18 @@ class Sudoku(object):
         # remove leading and trailing whitespace
         s = s.strip()
 
+        # plain digits of the expected length: use the fast path
+        if number_sep is None and len(empty) == 1:
+            if box_size is None and len(s) == 81:
+                plain_size = (3, 3)
+            else:
+                plain_size = box_size
+            if plain_size is not None:
+                try:
+                    return cls.decode_plain(s, plain_size, empty=empty)
+                except ValueError:
+                    pass
+
         # remove all unused whitespace
         if number_sep is None:
             special = empty + sudoku_sep + candidate_sep
@@ -429,6 +683,94 @@ class Sudoku(object):
 
         return sudoku
 
+    @classmethod
+    def decode_plain(cls, s, box_size=(3, 3), empty="0."):
+        """Create a new sudoku from a string of plain digits.
+
+        This is much faster than decode(), but only supports strings
+        with one digit (or empty character) for each field and no
+        whitespace or candidates within, e.g.::
+
+            000030000005009602008004013020060000703040106000080090...
+            ....3.....5..9.6.2..8..4.13.2..6....7.3.4.1.6....8..9.
+
+        Args:
+            s (str): A string representing the sudoku.
+            box_size (int, int): box_width and box_height of the new sudoku
+                                 (N <= 9).
+            empty (str): The characters representing empty fields.
+
+        Returns:
+            Sudoku: The newly created sudoku.
+
+        Raises:
+            ValueError: if s has the wrong length or invalid characters.
+        """
+        return cls.__plain_decoder(box_size, empty)(s.strip())
+
+    @classmethod
+    def decode_many(cls, lines, box_size=(3, 3), empty="0."):
+        """Create a new sudoku from each string of plain digits.
+
+        Works like decode_plain() for each line, but looks up the
+        decoder only once. Empty lines are skipped.
+
+        Args:
+            lines (iterable of str): Strings representing sudokus.
+            box_size (int, int): See decode_plain().
+            empty (str): See decode_plain().
+
+        Yields:
+            Sudoku: The newly created sudokus.
+
+        Raises:
+            ValueError: if a line has the wrong length or invalid characters.
+        """
+        decode = cls.__plain_decoder(box_size, empty)
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield decode(line)
+
+    @classmethod
+    def __plain_decoder(cls, box_size, empty):
+        """Return a function, which decodes a stripped string of digits.
+
+        This is an internal method used by decode_plain() and
+        decode_many() and should not be used otherwise.
+        """
+        key = cls, tuple(box_size), empty
+        if key in _PLAIN_DECODERS:
+            return _PLAIN_DECODERS[key]
+
+        template = cls(box_size=box_size)
+        size = template.__size
+        if size > 9:
+            raise ValueError(
+                "Plain digits only support sudokus with N <= 9.")
+
+        count = size ** 2
+        table = _plain_table(size, empty)
+
+        def decode(s):
+            if len(s) != count:
+                raise ValueError("Invalid number of fields given " +
+                                 "(must be %d): %d" % (count, len(s)))
+
+            numbers = s.encode("latin-1", "replace").translate(table)
+            if b"\xff" in numbers:
+                raise ValueError("Invalid characters in sudoku: %s" % s)
+
+            # share the geometry of the template and fill all fields at once
+            sudoku = cls.__new__(cls)
+            sudoku.__dict__.update(template.__dict__)
+            sudoku.__numbers = array("l", list(bytearray(numbers)))
+            sudoku.__candidates = [0] * count
+            return sudoku
+
+        _PLAIN_DECODERS[key] = decode
+        return decode
+
     def box_at(self, row, col):
         """Return the box index of the field at (row, col)
 
@@ -439,10 +781,10 @@ class Sudoku(object):
         Returns:
             int: The index of the box, in which the field (row, col) lies.
         """
-        return col // self.box_width + row - (row % self.box_height)
+        return self.geometry.box_at[self.__index(row, col)]
 
     def column_of(self, row, col, include=True):
-        """Return all coordinates in the column of (col, row) as a list.
+        """Return all coordinates in the column of (col, row) as a tuple.
 
         Args:
             row (int): The row of the field.
@@ -450,13 +792,13 @@ class Sudoku(object):
             include (bool): Whether or not to include (row, col).
 
         Returns:
-            list of (int, int): list of pairs (row, column) of all fields in
-                                the same column.
+            tuple of (int, int): pairs (row, column) of all fields in
+                                 the same column.
         """
-        return [(i, col) for i in self.indices if include or i != row]
+        return self.geometry.column_of(row, col, include)
 
     def row_of(self, row, col, include=True):
-        """Return all coordinates in the row of (col, row) as a list.
+        """Return all coordinates in the row of (col, row) as a tuple.
 
         Args:
             row (int): The row of the field.
@@ -464,13 +806,13 @@ class Sudoku(object):
             include (bool): Whether or not to include (row, col).
 
         Returns:
-            list of (int, int): list of pairs (row, column) of all fields in
-                                the same row.
+            tuple of (int, int): pairs (row, column) of all fields in
+                                 the same row.
         """
-        return [(row, j) for j in self.indices if include or j != col]
+        return self.geometry.row_of(row, col, include)
 
     def box_of(self, row, col, include=True):
-        """Return all coordinates in the region of (col, row) as a list.
+        """Return all coordinates in the region of (col, row) as a tuple.
 
         Args:
             row (int): The row of the field.
@@ -478,20 +820,13 @@ class Sudoku(object):
             include (bool): Whether or not to include (row, col).
 
         Returns:
-            list of (int, int): list of pairs (row, column) of all fields in
-                                the same box (region).
+            tuple of (int, int): pairs (row, column) of all fields in
+                                 the same box (region).
         """
-        grid_x = col - (col % self.box_width)
-        grid_y = row - (row % self.box_height)
-
-        coords = [(grid_y + i, grid_x + j)
-                  for i in range(self.box_height) for j in range(self.box_width)]
-        if not include:
-            coords.remove((row, col))
-        return coords
+        return self.geometry.box_of(row, col, include)
 
     def surrounding_of(self, row, col, include=True):
-        """Return all surrounding coordinates of (col, row) as a list.
+        """Return all surrounding coordinates of (col, row) as a tuple.
 
         Args:
             row (int): The row of the field.
@@ -499,45 +834,116 @@ class Sudoku(object):
             include (bool): Whether or not to include (row, col).
 
         Returns:
-            list of (int, int): list of pairs (row, column) of all fields in
-                                the same column, row or square.
-        """
-        coords = self.row_of(row, col, include=include)
-        coords.extend(self.column_of(row, col, include=include))
-        coords.extend(self._quad_without_row_and_column_of(row, col))
-
-        # remove two items of (col, row) in coords (there are three)
-        if include:
-            coords.remove((row, col))
-
-        return coords
-
-    def _quad_without_row_and_column_of(self, row, col):
-        """Return some coordinates in the square of (col, row) as a list.
-
-        The coordinates in the same row and column are removed.
-
-        This is an internal function and should not be used
-        outside of the sudoku module.
+            tuple of (int, int): pairs (row, column) of all fields in
+                                 the same column, row or square.
         """
-        grid_x = col - (col % self.box_width)
-        grid_y = row - (row % self.box_height)
-
-        return [(grid_y + i, grid_x + j) for i, j in product(
-                range(self.box_height), range(self.box_width))
-                if grid_y + i != row and grid_x + j != col]
+        return self.geometry.surrounding_of(row, col, include)
 
     def equals(self, other, candidates=False):
         for row, col in self:
             if self[(row, col)] != other[(row, col)]:
                 return False
-            if candidates and self.get_candidates(row, col) != \
-                    other.get_candidates(row, col):
+            if candidates and self.get_candidate_mask(row, col) != \
+                    other.get_candidate_mask(row, col):
                 return False
 
         return True
 
 
+# frozensets returned by from_mask(), keyed by their bitmask. The cache
+# is simply cleared, if it grows above _MASK_CACHE_SIZE entries.
+_MASK_CACHE = {}
+_MASK_CACHE_SIZE = 1 << 12
+
+# encoded candidates of Sudoku.encode(), keyed by their bitmask. The cache
+# is cleared like _MASK_CACHE.
+_CANDIDATE_STRINGS = {}
+
+# translation of numbers 0..9 to their digits (255 for other numbers)
+_DIGITS = bytes(bytearray(
+    [ord(str(number)) for number in range(10)] + [255] * 246))
+
+# translation tables and decoders of Sudoku.decode_plain(),
+# keyed by (N, empty) and (class, box size, empty)
+_PLAIN_TABLES = {}
+_PLAIN_DECODERS = {}
+
+
+def _plain_table(size, empty):
+    """Return the bytes.translate() table for digits 0..size and empty.
+
+    Invalid characters are translated to 255.
+    """
+    key = size, empty
+    if key not in _PLAIN_TABLES:
+        table = bytearray([255] * 256)
+        for number in range(size + 1):
+            table[ord(str(number))] = number
+        for c in empty:
+            table[ord(c)] = 0
+        _PLAIN_TABLES[key] = bytes(table)
+    return _PLAIN_TABLES[key]
+
+
+def to_mask(candidates):
+    """Return the bitmask representing the given candidates.
+
+    Args:
+        candidates (iterable of int): The candidates.
+
+    Returns:
+        int: The bitmask with bit n set for each candidate n.
+
+    Example::
+
+        >>> to_mask({1, 3})
+        10
+    """
+    mask = 0
+    for candidate in candidates:
+        mask |= 1 << candidate
+    return mask
+
+
+def from_mask(mask):
+    """Return the candidates represented by the given bitmask.
+
+    Args:
+        mask (int): The bitmask (bit n is set, if n is a candidate).
+
+    Returns:
+        frozenset: The candidates.
+
+    Example::
+
+        >>> sorted(from_mask(10))
+        [1, 3]
+    """
+    try:
+        return _MASK_CACHE[mask]
+    except KeyError:
+        pass
+
+    candidates = []
+    n = 0
+    bits = mask
+    while bits:
+        if bits & 1:
+            candidates.append(n)
+        bits >>= 1
+        n += 1
+
+    if len(_MASK_CACHE) >= _MASK_CACHE_SIZE:
+        _MASK_CACHE.clear()
+    value = _MASK_CACHE[mask] = frozenset(candidates)
+    return value
+
+
+def popcount(mask):
+    """Return the number of candidates in the given bitmask."""
+    return bin(mask).count("1")
+
+
 def view(
         sudoku,
         include_candidates=True, number_sep=None, candidate_prefix='*',
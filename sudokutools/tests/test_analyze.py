@@ -1,10 +1,11 @@
 from unittest import TestCase
 
 from sudokutools.analyze import (
-    rate, RATINGS, find_conflicts, is_solved, is_unique, score)
+    rate, RATINGS, canonical, find_conflicts, is_solved, is_unique, score,
+    statistics)
 from sudokutools.generate import create_solution, generate
 from sudokutools.solve import bruteforce, init_candidates
-from sudokutools.solvers import SOLVERS
+from sudokutools.solvers import SOLVERS, Budget, Profile
 from sudokutools.sudoku import Sudoku
 
 from sudokutools.tests.constants import NON_UNIQUE, SOLVE_EXAMPLES, \
@@ -121,3 +122,101 @@ class ScoreTests(TestCase):
         max_score = len(list(sudoku.empty())) * max(RATINGS.values())
         self.assertLessEqual(score(sudoku), max_score)
 
+
+
+class StatisticsTests(TestCase):
+    def test_same_as_rate_and_score(self):
+        """statistics() returns the results of rate() and score()."""
+        for example, solution in SOLVE_EXAMPLES:
+            sudoku = Sudoku.decode(example)
+            rating, total, steps = statistics(sudoku)
+            self.assertEqual(rating, rate(sudoku))
+            self.assertEqual(total, score(sudoku))
+            names = set(cls.__name__ for cls in RATINGS)
+            self.assertTrue(set(steps) <= names)
+
+    def test_solved(self):
+        """A solved sudoku needs no steps."""
+        self.assertEqual(statistics(create_solution()), (0, 0, {}))
+
+    def test_profile(self):
+        """A profile collects the steps of rate(), score() and statistics()."""
+        sudoku = generate(min_count=30)
+        profile = Profile()
+        rating, total, counts = statistics(sudoku, profile=profile)
+
+        applied = dict((name, stats["applied"])
+                       for name, stats in profile.as_dict().items()
+                       if stats["applied"])
+        self.assertEqual(applied, counts)
+
+        rate(sudoku, profile=profile)
+        score(sudoku, profile=profile)
+        for name, stats in profile.as_dict().items():
+            self.assertEqual(stats["applied"], 3 * counts.get(name, 0))
+
+    def test_budget(self):
+        """A budget limits the steps of statistics()."""
+        sudoku = generate(min_count=30)
+        rating, total, counts = statistics(sudoku)
+
+        budget = Budget(steps=5)
+        partial = statistics(sudoku, budget=budget)
+        self.assertTrue(budget.exceeded)
+        self.assertEqual(sum(partial[2].values()), 5)
+        self.assertTrue(partial[0] <= rating)
+        self.assertTrue(partial[1] <= total)
+
+
+def transform(sudoku, rows, cols, numbers, transpose=False):
+    """Return sudoku with rows, columns and numbers reordered."""
+    result = Sudoku(box_size=sudoku.box_size)
+    for i, row in enumerate(rows):
+        for j, col in enumerate(cols):
+            value = sudoku[row, col]
+            if transpose:
+                result[j, i] = numbers[value - 1] if value else 0
+            else:
+                result[i, j] = numbers[value - 1] if value else 0
+    return result
+
+
+class CanonicalTests(TestCase):
+    def test_equivalent(self):
+        """Equivalent sudokus have the same canonical form and hash."""
+        sudoku = Sudoku.decode(CONFLICT_EXAMPLE)
+        result, digest = canonical(sudoku)
+
+        rows = [4, 5, 3, 8, 6, 7, 1, 0, 2]
+        cols = [2, 0, 1, 6, 7, 8, 5, 4, 3]
+        numbers = [5, 3, 9, 1, 2, 8, 7, 4, 6]
+        for transpose in (False, True):
+            other = transform(sudoku, rows, cols, numbers, transpose)
+            self.assertNotEqual(other, sudoku)
+            self.assertEqual(canonical(other), (result, digest))
+
+    def test_sizes(self):
+        """The canonical form is equivalent to the sudoku in all sizes."""
+        for width, height in TEST_SIZES:
+            count = (width ** 2 * height ** 2) // 2
+            sudoku = generate(min_count=count, box_size=(width, height))
+            result, digest = canonical(sudoku)
+            self.assertEqual(result.box_size, sudoku.box_size)
+            self.assertEqual(result.count(), sudoku.count())
+            self.assertTrue(is_unique(result))
+            self.assertEqual(canonical(result), (result, digest))
+
+    def test_minimal(self):
+        """The canonical form starts with the emptiest row (or column)."""
+        sudoku = Sudoku.decode(CONFLICT_EXAMPLE)
+        result, digest = canonical(sudoku)
+        # the second column of the example is empty
+        self.assertEqual(result.encode()[:9], "000000000")
+        self.assertEqual(result.encode()[9:18], "001002003")
+
+    def test_different(self):
+        """Sudokus, which aren't equivalent, have different hashes."""
+        sudoku = Sudoku.decode(CONFLICT_EXAMPLE)
+        other = sudoku.copy()
+        other[0, 0] = 1
+        self.assertNotEqual(canonical(sudoku)[1], canonical(other)[1])
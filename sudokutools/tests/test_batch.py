@@ -0,0 +1,60 @@
+import json
+from unittest import TestCase
+
+from sudokutools.analyze import rate, score
+from sudokutools.batch import rate_lines, solve_lines
+from sudokutools.sudoku import Sudoku
+
+from sudokutools.tests.constants import SOLVE_EXAMPLES, UNSOLVABLES
+
+
+def encoded(s):
+    return Sudoku.decode(s).encode()
+
+
+class SolveLinesTests(TestCase):
+    def setUp(self):
+        self.lines = [encoded(example) for example, _ in SOLVE_EXAMPLES]
+        self.solutions = [encoded(solution) for _, solution in SOLVE_EXAMPLES]
+
+    def test_solutions_in_order(self):
+        """Solutions are yielded in the order of the lines."""
+        for engine in ("sets", "links"):
+            results = list(solve_lines(self.lines, engine=engine))
+            self.assertEqual(results, self.solutions)
+
+    def test_workers(self):
+        """Multiple workers yield the same results in the same order."""
+        lines = self.lines * 5
+        results = list(solve_lines(lines, workers=2, chunksize=2))
+        self.assertEqual(results, self.solutions * 5)
+
+    def test_empty_and_unsolvable(self):
+        """Empty lines and unsolvable sudokus yield empty lines."""
+        lines = ["", encoded(UNSOLVABLES[0]), self.lines[0] + "\n"]
+        self.assertEqual(
+            list(solve_lines(lines)), ["", "", self.solutions[0]])
+
+    def test_invalid_engine(self):
+        """An unknown engine raises ValueError."""
+        self.assertRaises(ValueError, solve_lines, self.lines, engine="nice")
+
+
+class RateLinesTests(TestCase):
+    def test_rate_and_score(self):
+        """Rating and score are the same as from rate() and score()."""
+        lines = [encoded(example) for example, _ in SOLVE_EXAMPLES]
+        for workers in (1, 2):
+            results = list(rate_lines(lines, workers=workers, chunksize=1))
+            self.assertEqual(len(results), len(lines))
+
+            for line, result in zip(lines, results):
+                sudoku = Sudoku.decode(line)
+                stats = json.loads(result)
+                self.assertEqual(stats["rating"], rate(sudoku))
+                self.assertEqual(stats["score"], score(sudoku))
+                self.assertIn("CalculateCandidates", stats["steps"])
+
+    def test_empty(self):
+        """Empty lines yield null."""
+        self.assertEqual(list(rate_lines(["\n"])), ["null"])
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from sudokutools.analyze import is_unique, rate, score, statistics
+from sudokutools.cache import MemoryCache, SQLiteCache, get_cache, \
+    puzzle_key, set_cache
+from sudokutools.solvers import solve
+from sudokutools.sudoku import Sudoku
+
+from sudokutools.tests.constants import SOLVE_EXAMPLES
+
+
+class MemoryCacheTests(TestCase):
+    def setUp(self):
+        self.cache = MemoryCache(maxsize=2)
+
+    def test_get_set(self):
+        """Stored records are returned."""
+        self.assertEqual(self.cache.get("a"), None)
+        self.cache.set("a", {"rating": 1})
+        self.cache.update("a", score=2)
+        self.assertEqual(self.cache.get("a"), {"rating": 1, "score": 2})
+
+    def test_evict(self):
+        """The least recently used records are removed."""
+        self.cache.set("a", {})
+        self.cache.set("b", {})
+        self.cache.get("a")
+        self.cache.set("c", {})
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), {})
+
+    def test_clear(self):
+        """clear() removes all records."""
+        self.cache.set("a", {})
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+class SQLiteCacheTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_persistent(self):
+        """Records are kept in the database file."""
+        cache = SQLiteCache(self.path)
+        cache.set("a", {"rating": 1, "steps": {"NakedSingle": 3}})
+        cache.close()
+
+        cache = SQLiteCache(self.path)
+        self.assertEqual(
+            cache.get("a"), {"rating": 1, "steps": {"NakedSingle": 3}})
+        cache.close()
+
+    def test_evict(self):
+        """The least recently used records are removed."""
+        cache = SQLiteCache(self.path, maxsize=2)
+        cache.set("a", {})
+        cache.set("b", {})
+        cache.get("a")
+        cache.set("c", {})
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), {})
+        cache.close()
+
+
+class TransparentCacheTests(TestCase):
+    def setUp(self):
+        self.previous = get_cache()
+
+    def tearDown(self):
+        set_cache(self.previous)
+
+    def check_results(self, cache):
+        """Results are the same with and without the cache."""
+        set_cache(None)
+        expected = []
+        for example, _ in SOLVE_EXAMPLES:
+            sudoku = Sudoku.decode(example)
+            steps = []
+            solution = solve(sudoku, steps.append)
+            expected.append((solution, steps, rate(sudoku), score(sudoku),
+                             statistics(sudoku), is_unique(sudoku)))
+
+        set_cache(cache)
+        for _ in range(2):
+            for (example, _), values in zip(SOLVE_EXAMPLES, expected):
+                sudoku = Sudoku.decode(example)
+                steps = []
+                solution = solve(sudoku, steps.append)
+                self.assertEqual(
+                    (solution, steps, rate(sudoku), score(sudoku),
+                     statistics(sudoku), is_unique(sudoku)), values)
+                self.assertTrue(solution.equals(values[0], candidates=True))
+
+        self.assertTrue("solution" in cache.get(puzzle_key(sudoku)))
+
+    def test_memory(self):
+        """A MemoryCache gives the same results."""
+        self.check_results(MemoryCache())
+
+    def test_sqlite(self):
+        """A SQLiteCache gives the same results."""
+        cache = SQLiteCache(":memory:", canonical=False)
+        self.check_results(cache)
+        cache.close()
+
+    def test_equivalent(self):
+        """Equivalent sudokus share uniqueness, but not their score."""
+        cache = MemoryCache()
+        set_cache(cache)
+        sudoku = Sudoku.decode(SOLVE_EXAMPLES[0][0])
+        self.assertTrue(is_unique(sudoku))
+        score(sudoku)
+
+        # swap the first two rows
+        other = sudoku.copy()
+        for col in range(9):
+            other[0, col], other[1, col] = sudoku[1, col], sudoku[0, col]
+        self.assertNotEqual(other, sudoku)
+
+        count = len(cache)
+        self.assertTrue(is_unique(other))
+        # only the exact key of other has been added
+        self.assertEqual(len(cache), count + 1)
+        self.assertFalse("unique" in cache.get(puzzle_key(other)))
+
+        # the score is stored for the exact sudoku
+        self.assertFalse("score" in cache.get(puzzle_key(other)))
+        set_cache(None)
+        expected = score(other)
+        set_cache(cache)
+        self.assertEqual(score(other), expected)
+        self.assertTrue("score" in cache.get(puzzle_key(other)))
@@ -1,6 +1,7 @@
 from unittest import TestCase
 
-from sudokutools.coordinates import the_box, the_column, the_part, the_row
+from sudokutools.coordinates import (
+    geometry, surrounding_of, the_box, the_column, the_part, the_row)
 
 BOXES_3x3 = (
     (0, 0, 0, 1, 1, 1, 2, 2, 2),
@@ -80,3 +81,36 @@ class PartTests(TestCase):
                 self.assertEqual(
                     coords, the_part(part, width=width, height=height))
 
+
+
+class GeometryTests(TestCase):
+    def test_cached(self):
+        """geometry() returns the same instance for the same box size."""
+        self.assertIs(geometry(3, 3), geometry(3, 3))
+        self.assertIsNot(geometry(2, 3), geometry(3, 2))
+
+    def test_boxes(self):
+        """The precomputed boxes match the_box()."""
+        for example, width, height in ((BOXES_3x3, 3, 3), (BOXES_5x2, 5, 2)):
+            geo = geometry(width, height)
+            for box, indices in enumerate(geo.boxes):
+                coords = [geo.coords[i] for i in indices]
+                self.assertEqual(coords, the_box(box, width, height))
+                for row, col in coords:
+                    self.assertEqual(example[row][col], box)
+
+    def test_peers(self):
+        """The precomputed peers match surrounding_of()."""
+        for width, height in ((2, 2), (3, 2), (3, 3), (5, 2)):
+            geo = geometry(width, height)
+            for i, (row, col) in enumerate(geo.coords):
+                coords = [geo.coords[j] for j in geo.peers[i]]
+                self.assertEqual(
+                    coords, surrounding_of(row, col, width, height, False))
+
+    def test_houses_of(self):
+        """Each field lies in the houses given by houses_of."""
+        geo = geometry(3, 2)
+        for i in range(geo.size ** 2):
+            houses = [h for h, fields in enumerate(geo.houses) if i in fields]
+            self.assertEqual(tuple(houses), geo.houses_of[i])
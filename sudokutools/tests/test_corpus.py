@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from sudokutools.corpus import Corpus, CorpusWriter, write_corpus
+from sudokutools.generate import create_solution
+from sudokutools.sudoku import Sudoku
+
+from sudokutools.tests.constants import SOLVE_EXAMPLES
+
+
+class CorpusTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "puzzles.sdk")
+        self.sudokus = [Sudoku.decode(example)
+                        for example, _ in SOLVE_EXAMPLES[:3]]
+        self.solutions = [Sudoku.decode(solution)
+                          for _, solution in SOLVE_EXAMPLES[:3]]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """Sudokus, solutions and ratings are read as written."""
+        for packed in (False, True):
+            count = write_corpus(self.path, self.sudokus, self.solutions,
+                                 [1, None, 10], packed=packed)
+            self.assertEqual(count, 3)
+
+            with Corpus(self.path) as corpus:
+                self.assertEqual(corpus.packed, packed)
+                self.assertEqual(len(corpus), 3)
+                self.assertEqual(list(corpus), self.sudokus)
+                self.assertEqual(corpus[-1], self.sudokus[-1])
+                self.assertEqual(
+                    [corpus.solution(i) for i in range(3)], self.solutions)
+                self.assertEqual(
+                    [corpus.rating(i) for i in range(3)], [1, None, 10])
+                self.assertRaises(IndexError, corpus.__getitem__, 3)
+
+    def test_without_extras(self):
+        """Without solutions and ratings None is returned for them."""
+        write_corpus(self.path, self.sudokus)
+        with Corpus(self.path) as corpus:
+            self.assertEqual(corpus.record_size, 41)
+            self.assertEqual(corpus[1], self.sudokus[1])
+            self.assertEqual(corpus.solution(1), None)
+            self.assertEqual(corpus.rating(1), None)
+
+    def test_view(self):
+        """view() and numbers() return the stored fields."""
+        write_corpus(self.path, self.sudokus, packed=False)
+        with Corpus(self.path) as corpus:
+            sudoku = self.sudokus[2]
+            numbers = bytes(bytearray(
+                sudoku.get_at(i) for i in range(len(sudoku))))
+            view = corpus.view(2)
+            self.assertEqual(bytes(view), numbers)
+            self.assertEqual(corpus.numbers(2), numbers)
+            view.release()
+
+            records = corpus.records()
+            self.assertEqual(len(records), 3 * 81)
+            records.release()
+
+    def test_sizes(self):
+        """Sudokus of other sizes are stored (packed if possible)."""
+        for box_size, packed in (((2, 3), True), ((4, 4), False)):
+            solutions = [create_solution(box_size=box_size)
+                         for _ in range(2)]
+            sudokus = [solution.copy() for solution in solutions]
+            for sudoku in sudokus:
+                for i in range(0, len(sudoku), 3):
+                    sudoku.set_at(i, 0)
+            write_corpus(self.path, sudokus, solutions)
+
+            with Corpus(self.path) as corpus:
+                self.assertEqual(corpus.box_size, box_size)
+                self.assertEqual(corpus.packed, packed)
+                self.assertEqual(list(corpus), sudokus)
+                self.assertEqual(corpus.solution(1), solutions[1])
+
+    def test_writer(self):
+        """The writer counts records and rejects invalid ones."""
+        with CorpusWriter(self.path, ratings=True) as writer:
+            writer.write(self.sudokus[0], rating=3)
+            self.assertRaises(ValueError, writer.write, self.sudokus[1],
+                              rating=255)
+            self.assertRaises(ValueError, writer.write,
+                              Sudoku(box_size=(2, 2)))
+        self.assertRaises(ValueError, CorpusWriter, self.path, (4, 4), True)
+
+        with Corpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 1)
+            self.assertEqual(corpus.rating(0), 3)
+
+    def test_invalid_file(self):
+        """Files, which aren't corpus files, raise ValueError."""
+        with open(self.path, "wb") as f:
+            f.write(b"000030000005009602008004013020060000703040106")
+        self.assertRaises(ValueError, Corpus, self.path)
@@ -2,7 +2,8 @@ from unittest import TestCase
 
 from sudokutools.analyze import is_unique, find_conflicts
 from sudokutools.generate import (
-    generate, generate_from_template, create_solution
+    generate, generate_from_template, generate_many, create_solution,
+    SYMMETRY
 )
 from sudokutools.sudoku import Sudoku
 from sudokutools.tests.constants import TEST_SIZES
@@ -59,6 +60,20 @@ class CreateSolutionTests(TestCase):
             self.assertEqual(sudoku.count(), width**2 * height**2)
             self.assertEqual(list(find_conflicts(sudoku)), [])
 
+    def test_unbiased_solution_is_complete_and_correct(self):
+        """A solution created by searching is complete and correct."""
+        for width, height in TEST_SIZES:
+            sudoku = create_solution(box_size=(width, height), unbiased=True)
+            self.assertEqual(sudoku.count(), width**2 * height**2)
+            self.assertEqual(list(find_conflicts(sudoku)), [])
+
+    def test_created_solutions_differ(self):
+        """Created solutions are random."""
+        for width, height in TEST_SIZES:
+            solutions = set(create_solution(box_size=(width, height)).encode()
+                            for i in range(10))
+            self.assertGreater(len(solutions), 1)
+
 
 class GenerateTests(TestCase):
     def test_generated_is_solvable_and_unique(self):
@@ -69,6 +84,20 @@ class GenerateTests(TestCase):
             self.assertEqual(len(list(find_conflicts(sudoku))), 0)
             self.assertEqual(is_unique(sudoku), True)
 
+    def test_generated_is_minimal(self):
+        """No group of fields can be removed from a generated sudoku."""
+        for symmetry in (None, "rotate-180", "mirror-xy"):
+            sudoku = generate(symmetry=symmetry)
+            self.assertEqual(is_unique(sudoku), True)
+
+            for row, col in sudoku:
+                if not sudoku[row, col]:
+                    continue
+                changed = sudoku.copy()
+                for i, j in SYMMETRY[symmetry](3, 3, row, col):
+                    changed[i, j] = 0
+                self.assertEqual(is_unique(changed), False)
+
     def test_generate_min(self):
         """A generated sudoku has no less than the number of fields we want."""
         for width, height in TEST_SIZES:
@@ -90,6 +119,28 @@ class GenerateTests(TestCase):
         self.assertRaises(ValueError, generate, symmetry="nice")
 
 
+class GenerateManyTests(TestCase):
+    def test_generated_are_unique(self):
+        """generate_many() yields n unique sudokus."""
+        sudokus = list(generate_many(4, workers=2, box_size=(2, 3)))
+        self.assertEqual(len(sudokus), 4)
+        for sudoku in sudokus:
+            self.assertEqual(sudoku.box_size, (2, 3))
+            self.assertEqual(is_unique(sudoku), True)
+
+    def test_seed(self):
+        """The same seed yields the same sudokus with any number of workers."""
+        sudokus1 = list(generate_many(3, workers=1, seed=42))
+        sudokus2 = list(generate_many(3, workers=2, seed=42))
+        self.assertEqual(sudokus1, sudokus2)
+        self.assertNotEqual(sudokus1[0], sudokus1[1])
+
+    def test_invalid_arguments(self):
+        """Invalid arguments raise ValueError."""
+        self.assertRaises(ValueError, next, generate_many(1, symmetry="nice"))
+        self.assertRaises(ValueError, next, generate_many(1, min_count=82))
+
+
 class GenerateFromTemplateTests(TestCase):
     def test_has_same_pattern(self):
         """A sudoku generated from a template has the template's pattern."""
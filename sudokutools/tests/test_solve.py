@@ -1,8 +1,12 @@
+import inspect
+import sys
+import threading
 from unittest import TestCase
 
 from sudokutools.analyze import find_conflicts
 from sudokutools.generate import generate
-from sudokutools.solve import bruteforce, dlx, calc_candidates, init_candidates
+from sudokutools.solve import bruteforce, dlx, calc_candidates, \
+    count_solutions, init_candidates, apply_singles
 from sudokutools.sudoku import Sudoku
 
 from sudokutools.tests.constants import SOLVE_EXAMPLES, NON_UNIQUE, UNSOLVABLES
@@ -96,6 +100,18 @@ class DLXTests(TestCase):
         sol2 = next(solutions)
         self.assertNotEqual(sol1, sol2)
 
+    def test_repeated(self):
+        """DLX works repeatedly, even if solving is stopped early."""
+        sudoku = Sudoku.decode(NON_UNIQUE)
+        for i in range(3):
+            next(dlx(sudoku))
+
+        for example_str, solution_str in SOLVE_EXAMPLES:
+            example = Sudoku.decode(example_str)
+            solution = Sudoku.decode(solution_str)
+            self.assertEqual(list(dlx(example)), [solution])
+            self.assertEqual(list(dlx(example)), [solution])
+
     def test_unsolvable(self):
         """DLX yields nothing on unsolvable sudokus."""
         for unsolvable in UNSOLVABLES:
@@ -105,6 +121,174 @@ class DLXTests(TestCase):
             self.assertEqual(list(dlx(sudoku)), [])
 
 
+class DLXLinksTests(TestCase):
+    def test_examples(self):
+        """The links engine solves the given examples."""
+        for example_str, solution_str in SOLVE_EXAMPLES:
+            example = Sudoku.decode(example_str)
+            solution = Sudoku.decode(solution_str)
+            self.assertEqual(list(dlx(example, engine="links")), [solution])
+
+    def test_reverse_on_non_unique(self):
+        """The links engine yields multiple solutions on non-unique sudokus."""
+        sudoku = Sudoku.decode(NON_UNIQUE)
+        solutions = dlx(sudoku, engine="links")
+        sol1 = next(solutions)
+        sol2 = next(solutions)
+        self.assertNotEqual(sol1, sol2)
+
+    def test_all_solutions(self):
+        """The links engine finds all solutions of an empty 4x4 sudoku."""
+        sudoku = Sudoku(box_size=(2, 2))
+        solutions = list(dlx(sudoku, engine="links"))
+        self.assertEqual(len(solutions), 288)
+
+        encoded = sorted(s.encode() for s in solutions)
+        others = sorted(s.encode() for s in dlx(sudoku, engine="sets"))
+        self.assertEqual(encoded, others)
+
+    def test_unsolvable(self):
+        """The links engine yields nothing on unsolvable sudokus."""
+        for unsolvable in UNSOLVABLES:
+            sudoku = Sudoku.decode(unsolvable)
+            self.assertEqual(list(dlx(sudoku, engine="links")), [])
+
+        for value in (-1, 10):
+            sudoku = Sudoku()
+            sudoku[0, 0] = value
+            self.assertEqual(list(dlx(sudoku, engine="links")), [])
+            self.assertEqual(count_solutions(sudoku), 0)
+
+    def test_invalid_engine(self):
+        """An unknown engine raises ValueError."""
+        self.assertRaises(ValueError, next, dlx(Sudoku(), engine="nice"))
+
+
+class CountSolutionsTests(TestCase):
+    def test_examples(self):
+        """The given examples have exactly one solution."""
+        for example_str, solution_str in SOLVE_EXAMPLES:
+            example = Sudoku.decode(example_str)
+            self.assertEqual(count_solutions(example), 1)
+            self.assertEqual(count_solutions(example, limit=2), 1)
+
+    def test_all_solutions(self):
+        """All solutions of an empty 4x4 sudoku are counted."""
+        sudoku = Sudoku(box_size=(2, 2))
+        self.assertEqual(count_solutions(sudoku), 288)
+
+    def test_limit(self):
+        """Counting stops after limit solutions."""
+        sudoku = Sudoku.decode(NON_UNIQUE)
+        self.assertEqual(count_solutions(sudoku, limit=1), 1)
+        self.assertEqual(count_solutions(sudoku, limit=2), 2)
+        self.assertEqual(count_solutions(sudoku, limit=5), 5)
+
+    def test_non_positive_limit(self):
+        """A limit of 0 or less counts no solutions."""
+        sudoku = Sudoku.decode(NON_UNIQUE)
+        self.assertEqual(count_solutions(sudoku, limit=0), 0)
+        self.assertEqual(count_solutions(sudoku, limit=-1), 0)
+
+    def test_repeated(self):
+        """Counting leaves the cached matrix unchanged."""
+        non_unique = Sudoku.decode(NON_UNIQUE)
+        for i in range(3):
+            self.assertEqual(count_solutions(non_unique, limit=2), 2)
+
+        for unsolvable in UNSOLVABLES:
+            count_solutions(Sudoku.decode(unsolvable))
+
+        sudoku = Sudoku(box_size=(2, 2))
+        self.assertEqual(count_solutions(sudoku), 288)
+        self.assertEqual(count_solutions(sudoku), 288)
+
+    def test_threads(self):
+        """Threads counting at the same time get the right counts."""
+        sudokus = [Sudoku.decode(NON_UNIQUE)]
+        sudokus.extend(Sudoku.decode(e) for e, _ in SOLVE_EXAMPLES)
+        expected = [count_solutions(sudoku, limit=2) for sudoku in sudokus]
+        results = []
+
+        def count():
+            for _ in range(5):
+                results.append([count_solutions(sudoku, limit=2)
+                                for sudoku in sudokus])
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(results, [expected] * 20)
+
+    def test_unsolvable(self):
+        """Sudokus with conflicts or without solutions have none."""
+        for unsolvable in UNSOLVABLES:
+            sudoku = Sudoku.decode(unsolvable)
+            self.assertEqual(count_solutions(sudoku), 0)
+
+        sudoku = Sudoku.decode(SOLVE_EXAMPLES[0][0])
+        sudoku[0, 0] = 5
+        self.assertEqual(count_solutions(sudoku), 0)
+
+
+class ApplySinglesTests(TestCase):
+    def test_examples(self):
+        """Applying singles only sets numbers of the solution."""
+        for example_str, solution_str in SOLVE_EXAMPLES:
+            example = Sudoku.decode(example_str)
+            solution = Sudoku.decode(solution_str)
+            sudoku = example.copy()
+            self.assertTrue(apply_singles(sudoku))
+            self.assertGreater(len(list(example.empty())),
+                               len(list(sudoku.empty())))
+            for row, col in sudoku:
+                if sudoku[row, col]:
+                    self.assertEqual(sudoku[row, col], solution[row, col])
+
+    def test_contradictions(self):
+        """Contradictions are found."""
+        for unsolvable in UNSOLVABLES:
+            self.assertFalse(apply_singles(Sudoku.decode(unsolvable)))
+
+        sudoku = Sudoku()
+        sudoku[0, 0] = 10
+        self.assertFalse(apply_singles(sudoku))
+
+        # no candidates left at (0, 0)
+        sudoku = Sudoku()
+        for col in range(1, 9):
+            sudoku[0, col] = col
+        sudoku[1, 0] = 9
+        self.assertEqual(list(find_conflicts(sudoku)), [])
+        self.assertFalse(apply_singles(sudoku))
+
+    def test_propagate(self):
+        """Propagation doesn't change the solutions."""
+        for example_str, solution_str in SOLVE_EXAMPLES:
+            example = Sudoku.decode(example_str)
+            solution = Sudoku.decode(solution_str)
+            for engine in ("sets", "links"):
+                self.assertEqual(
+                    list(dlx(example, engine=engine, propagate=True)),
+                    [solution])
+            self.assertEqual(count_solutions(example, propagate=True), 1)
+
+        sudoku = Sudoku.decode(NON_UNIQUE)
+        self.assertEqual(count_solutions(sudoku, limit=2, propagate=True), 2)
+        sudoku = Sudoku(box_size=(2, 2))
+        self.assertEqual(count_solutions(sudoku, propagate=True), 288)
+
+        for unsolvable in UNSOLVABLES:
+            sudoku = Sudoku.decode(unsolvable)
+            self.assertEqual(list(dlx(sudoku, propagate=True)), [])
+            self.assertEqual(count_solutions(sudoku, propagate=True), 0)
+
+
 class CompareTests(TestCase):
     def test_compare_with_bruteforce(self):
         """DLX yields the same solutions as bruteforce."""
@@ -113,6 +297,24 @@ class CompareTests(TestCase):
             self.assertEqual(next(bruteforce(sudoku)), next(dlx(sudoku)))
 
 
+class RecursionTests(TestCase):
+    def setUp(self):
+        self.limit = sys.getrecursionlimit()
+
+    def tearDown(self):
+        sys.setrecursionlimit(self.limit)
+
+    def test_no_recursion(self):
+        """Solving doesn't depend on the recursion limit."""
+        sudoku = Sudoku(box_size=(3, 3))
+        # leave less room than the 81 levels of a recursive search
+        sys.setrecursionlimit(len(inspect.stack()) + 40)
+        for engine in ("sets", "links"):
+            solution = next(dlx(sudoku, engine=engine))
+            self.assertEqual(list(find_conflicts(solution)), [])
+        self.assertEqual(list(find_conflicts(next(bruteforce(sudoku)))), [])
+
+
 class CandidatesTest(TestCase):
     def test_calc_candidates_in_example(self):
         """Candidates in the given examples are calculated correctly."""
@@ -124,6 +326,14 @@ class CandidatesTest(TestCase):
             candidates = calc_candidates(sudoku2, row, col)
             self.assertEqual(sudoku1.get_candidates(row, col), candidates)
 
+    def test_out_of_range_peers(self):
+        """Numbers outside of the valid range don't remove candidates."""
+        sudoku = Sudoku()
+        sudoku[0, 1] = -1
+        sudoku[0, 2] = 10
+        self.assertEqual(calc_candidates(sudoku, 0, 0), set(range(1, 10)))
+        self.assertEqual(calc_candidates(sudoku, 0, 1), set())
+
     def test_init_candidates(self):
         """Candidates in the given sudoku are calculated correctly."""
         sudoku1 = Sudoku.decode(CANDIDATES_EXAMPLE)
@@ -1,5 +1,7 @@
+import json
 from unittest import TestCase
 
+from sudokutools.actions import RemoveCandidates, SetNumber
 from sudokutools.analyze import find_conflicts
 from sudokutools.generate import generate
 from sudokutools.solve import bruteforce, init_candidates
@@ -10,7 +12,7 @@ from sudokutools.solvers import (
     PointingPair, PointingTriple,
     XWing, Swordfish, Jellyfish,
     Bruteforce,
-    SOLVERS
+    SOLVERS, Budget, HintEngine, Profile, hints, solve
 )
 from sudokutools.sudoku import Sudoku
 
@@ -73,6 +75,16 @@ FIRST_STEPS = [
 TEST_SIZES = ((2, 2), (2, 3), (2, 4), (3, 3), (4, 4))
 
 
+def all_hints(engine):
+    """Return all hints of a HintEngine for the current sudoku."""
+    found = []
+    step = engine.next_hint()
+    while step is not None:
+        found.append(step)
+        step = engine.next_hint()
+    return found
+
+
 class BasicTests(TestCase):
     def setUp(self):
         # We generate examples once - this reduces test time a bit.
@@ -114,6 +126,145 @@ class BasicTests(TestCase):
                     cls.apply_all(sudoku)
             self.assertEqual(sudoku, solution)
 
+    def test_solve_skips_unchanged(self):
+        """solve() finds the same steps as calling find() each time."""
+        for example in self.examples + [Sudoku.decode(EXAMPLE)]:
+            steps = []
+            solution = solve(example, report=steps.append)
+
+            sudoku = example.copy()
+            init_candidates(sudoku, filled_only=True)
+            expected = []
+            while True:
+                for cls in SOLVERS:
+                    count = 0
+                    for step in cls.find(sudoku):
+                        expected.append(step)
+                        step.apply(sudoku)
+                        count += 1
+                    if count > 0:
+                        break
+                else:
+                    break
+
+            self.assertEqual(steps, expected)
+            self.assertEqual(solution, sudoku)
+
+    def test_profile(self):
+        """A profile counts the steps found and applied by solve()."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        steps = []
+        profile = Profile()
+        solve(sudoku, report=steps.append, profile=profile)
+
+        stats = profile.as_dict()
+        for cls in set(step.__class__ for step in steps):
+            count = len([s for s in steps if s.__class__ == cls])
+            self.assertEqual(stats[cls.__name__]["found"], count)
+            self.assertEqual(stats[cls.__name__]["applied"], count)
+
+        for name in stats:
+            self.assertGreater(stats[name]["calls"], 0)
+        self.assertGreater(stats["NakedSingle"]["eliminated"], 0)
+        self.assertEqual(stats["CalculateCandidates"]["eliminated"], 0)
+        self.assertEqual(json.loads(profile.to_json()), stats)
+
+    def test_profile_hints(self):
+        """A profile counts the steps found by hints() without applying."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        init_candidates(sudoku)
+        profile = Profile()
+        found = list(hints(sudoku, profile=profile))
+
+        stats = profile.as_dict()
+        self.assertEqual(sum(s["found"] for s in stats.values()), len(found))
+        self.assertEqual(sum(s["applied"] for s in stats.values()), 0)
+        self.assertEqual(stats["NakedSingle"]["calls"], 1)
+
+    def test_solvers(self):
+        """solve() only uses the given solve methods."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        steps = []
+        plan = [CalculateCandidates, NakedSingle, HiddenSingle]
+        solution = solve(sudoku, report=steps.append, solvers=plan)
+
+        self.assertEqual(set(step.__class__ for step in steps), set(plan))
+        self.assertNotEqual(solution, sudoku)
+
+    def test_step_budget(self):
+        """solve() stops after the given number of steps."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        steps = []
+        budget = Budget(steps=10)
+        solution = solve(sudoku, report=steps.append, budget=budget)
+
+        self.assertEqual(len(steps), 10)
+        self.assertTrue(budget.exceeded)
+        self.assertTrue(list(solution.empty()))
+
+    def test_large_budget(self):
+        """A budget, which isn't used up, isn't exceeded."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        steps = []
+        solution = solve(sudoku, report=steps.append)
+
+        budget = Budget(seconds=60, steps=len(steps))
+        self.assertEqual(solve(sudoku, budget=budget), solution)
+        self.assertFalse(budget.exceeded)
+
+    def test_time_budget(self):
+        """solve() and hints() do nothing without time."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        budget = Budget(seconds=0)
+        self.assertEqual(solve(sudoku, budget=budget), sudoku)
+        self.assertTrue(budget.exceeded)
+
+        init_candidates(sudoku)
+        self.assertEqual(list(hints(sudoku, budget=Budget(seconds=0))), [])
+
+    def test_hints_budget(self):
+        """hints() stops after the given number of steps."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        init_candidates(sudoku)
+        budget = Budget(steps=3)
+        self.assertEqual(len(list(hints(sudoku, budget=budget))), 3)
+        self.assertTrue(budget.exceeded)
+
+    def test_hint_engine(self):
+        """A HintEngine yields the same hints as hints() after changes."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        init_candidates(sudoku)
+        engine = HintEngine(sudoku)
+
+        for action in (SetNumber(((1, 2),), 3),
+                       RemoveCandidates(((0, 0), (2, 0)), {4, 7}),
+                       SetNumber(((5, 6),), 2)):
+            expected = list(hints(sudoku))
+            found = all_hints(engine)
+            self.assertEqual(found, expected)
+            self.assertIsNone(engine.next_hint())
+
+            action(sudoku)
+            engine.apply(action)
+
+        self.assertTrue(engine.sudoku.equals(sudoku, candidates=True))
+        self.assertEqual(all_hints(engine),
+                         list(hints(sudoku)))
+
+    def test_hint_engine_update(self):
+        """A HintEngine can be updated to any changed sudoku."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        init_candidates(sudoku)
+        engine = HintEngine(sudoku)
+        self.assertIsNotNone(engine.next_hint())
+
+        for step in list(hints(sudoku))[:5]:
+            step.apply(sudoku)
+        engine.update(sudoku)
+        self.assertTrue(engine.sudoku.equals(sudoku, candidates=True))
+        self.assertEqual(all_hints(engine),
+                         list(hints(sudoku)))
+
     def test_unsolvable(self):
         """find() doesn't raise an exception on unsolvable sudokus."""
         for example in self.examples:
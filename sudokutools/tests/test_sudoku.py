@@ -1,7 +1,12 @@
+import io
+import os
+import pickle
+import shutil
+import tempfile
 from itertools import product
 from unittest import TestCase
 
-from sudokutools.sudoku import Sudoku, view
+from sudokutools.sudoku import Sudoku, view, from_mask, to_mask
 from sudokutools.solve import init_candidates
 
 EXAMPLE = """
@@ -188,12 +193,124 @@ class SudokuTests(TestCase):
         self.assertEqual(str(sudoku), EXAMPLE_16_STR)
         self.assertEqual(sudoku.box_size, (4, 4))
 
+    def test_decode_plain(self):
+        """Plain digits and dots are decoded like with decode()."""
+        s = EXAMPLE.replace('\n', '')
+        expected = Sudoku.decode(EXAMPLE)
+
+        sudoku = Sudoku.decode_plain(s.replace('0', '.'))
+        self.assertEqual(sudoku, expected)
+        self.assertEqual(sudoku.box_size, (3, 3))
+        self.assertEqual(sudoku.get_candidates(0, 0), set())
+
+        # decoded sudokus don't share their fields
+        sudoku[0, 0] = 1
+        self.assertEqual(Sudoku.decode_plain(s), expected)
+        self.assertEqual(Sudoku.decode(s), expected)
+
+        sudoku = Sudoku.decode_plain("1020" * 4, box_size=(2, 2))
+        self.assertEqual(sudoku, Sudoku.decode("1020" * 4))
+
+        self.assertRaises(ValueError, Sudoku.decode_plain, s[:-1])
+        self.assertRaises(ValueError, Sudoku.decode_plain, s[:-1] + "x")
+        self.assertRaises(ValueError, Sudoku.decode_plain, "5" * 16,
+                          box_size=(2, 2))
+        self.assertRaises(ValueError, Sudoku.decode, s.replace('0', '.'))
+
+    def test_decode_many(self):
+        """decode_many() decodes each line and skips empty lines."""
+        lines = [EXAMPLE.replace('\n', ''), "", EXAMPLE.replace('\n', '')]
+        sudokus = list(Sudoku.decode_many(lines))
+        self.assertEqual(sudokus, [Sudoku.decode(EXAMPLE)] * 2)
+        self.assertIsNot(sudokus[0], sudokus[1])
+
     def test_encode(self):
         """A sudoku is encoded to a valid string."""
         s = EXAMPLE.replace('\n', '')
         sudoku = Sudoku.decode(EXAMPLE)
         self.assertEqual(sudoku.encode(include_candidates=False), s)
 
+    def test_encode_other_numbers(self):
+        """Numbers above 9 and negative numbers are encoded."""
+        sudoku = Sudoku.decode(EXAMPLE_16, number_sep=" ")
+        encoded = sudoku.encode(row_sep=" ", col_sep=" ")
+        self.assertEqual(Sudoku.decode(encoded, number_sep=" "), sudoku)
+        self.assertEqual(sudoku.encode(), encoded.replace(" ", ""))
+
+        sudoku = Sudoku.decode(EXAMPLE)
+        sudoku[0, 0] = -1
+        self.assertEqual(sudoku.encode()[:4], "-103")
+        sudoku[0, 0] = 12
+        self.assertEqual(sudoku.encode()[:4], "1203")
+
+    def test_encode_candidates(self):
+        """Candidates are encoded and decoded again."""
+        sudoku = Sudoku.decode(CANDIDATES_EXAMPLE)
+        encoded = sudoku.encode(include_candidates=True)
+        self.assertEqual(encoded.split("|")[1].split(",")[1], "4578")
+
+        other = Sudoku.decode(encoded)
+        self.assertTrue(other.equals(sudoku, candidates=True))
+
+    def test_encode_many(self):
+        """encode_many() and write_many() encode each sudoku."""
+        sudokus = [Sudoku.decode(EXAMPLE), Sudoku.decode(CANDIDATES_EXAMPLE)]
+        sudokus[0][0, 0] = 12
+        for include_candidates in (False, True):
+            lines = [sudoku.encode(include_candidates=include_candidates)
+                     for sudoku in sudokus]
+            self.assertEqual(
+                list(Sudoku.encode_many(sudokus, include_candidates)), lines)
+
+            for f in (io.BytesIO(), io.StringIO()):
+                count = Sudoku.write_many(
+                    f, sudokus, include_candidates, buffer_size=10)
+                self.assertEqual(count, 2)
+                value = f.getvalue()
+                if isinstance(value, bytes):
+                    value = value.decode("ascii")
+                self.assertEqual(value, "\n".join(lines) + "\n")
+
+    def test_write_many_text_file(self):
+        """write_many() keeps the order of text written before."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "sudokus.txt")
+            with open(path, "w") as f:
+                f.write("first\n")
+                Sudoku.write_many(f, [Sudoku.decode(EXAMPLE)])
+                f.write("last\n")
+            with open(path) as f:
+                self.assertEqual(f.read().split(), [
+                    "first", EXAMPLE.replace("\n", ""), "last"])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_write_many_newline(self):
+        """write_many() keeps the newline translation of text files."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "sudokus.txt")
+            with open(path, "w", newline="\r\n") as f:
+                Sudoku.write_many(f, [Sudoku.decode(EXAMPLE)] * 2)
+            with open(path, "rb") as f:
+                line = EXAMPLE.replace("\n", "").encode("ascii")
+                self.assertEqual(f.read(), (line + b"\r\n") * 2)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_invalid_coordinates(self):
+        """Coordinates outside of the sudoku raise IndexError."""
+        sudoku = Sudoku.decode(EXAMPLE)
+        for row, col in ((0, 9), (9, 0), (-1, 0), (0, -1)):
+            self.assertRaises(IndexError, sudoku.__getitem__, (row, col))
+            self.assertRaises(
+                IndexError, sudoku.__setitem__, (row, col), 3)
+            self.assertRaises(IndexError, sudoku.get_candidates, row, col)
+            self.assertRaises(
+                IndexError, sudoku.set_candidate_mask, row, col, 2)
+        self.assertEqual(sudoku, Sudoku.decode(EXAMPLE))
+
     def test_str(self):
         """str(sudoku) returns a correct human readable string."""
         sudoku = Sudoku.decode(EXAMPLE)
@@ -248,6 +365,23 @@ class SudokuTests(TestCase):
         sudoku1[2, 3] -= 1
         self.assertNotEqual(sudoku1, sudoku2)
 
+    def test_hash(self):
+        """Equal sudokus have equal hashes and keys."""
+        sudoku1 = Sudoku.decode(EXAMPLE)
+        sudoku2 = Sudoku.decode(EXAMPLE)
+        sudoku1.set_candidates(0, 0, {3, 4})
+        self.assertEqual(hash(sudoku1), hash(sudoku2))
+        self.assertEqual(sudoku1.key(), sudoku2.key())
+        self.assertEqual(len({sudoku1, sudoku2}), 1)
+
+        sudoku1[2, 3] -= 1
+        self.assertNotEqual(sudoku1.key(), sudoku2.key())
+
+    def test_key_box_size(self):
+        """Sudokus with different box sizes have different keys."""
+        self.assertNotEqual(
+            Sudoku(box_size=(2, 3)).key(), Sudoku(box_size=(3, 2)).key())
+
     def test_equal_type(self):
         """If an object returns the same numbers in every field, it's equal."""
         sudoku = Sudoku.decode(EXAMPLE)
@@ -295,6 +429,63 @@ class SudokuTests(TestCase):
         sudoku.remove_candidates(0, 0, {2, 4})
         self.assertEqual(sudoku.get_candidates(0, 0), {1, 3})
 
+    def test_candidate_mask(self):
+        """Candidate bitmasks and candidate sets describe the same field."""
+        sudoku = Sudoku()
+        sudoku.set_candidates(0, 0, {1, 3, 9})
+        self.assertEqual(sudoku.get_candidate_mask(0, 0), 0b1000001010)
+
+        sudoku.set_candidate_mask(0, 1, 0b110)
+        self.assertEqual(sudoku.get_candidates(0, 1), {1, 2})
+
+        sudoku.remove_candidate_mask(0, 0, to_mask({3, 4}))
+        self.assertEqual(sudoku.get_candidates(0, 0), {1, 9})
+
+    def test_mask_conversion(self):
+        """to_mask() and from_mask() are inverse to each other."""
+        for candidates in (set(), {1}, {2, 5, 7}, set(range(1, 17))):
+            self.assertEqual(from_mask(to_mask(candidates)), candidates)
+
+    def test_flat_index(self):
+        """get_at() and set_at() access fields by their flat index."""
+        for width, height in TEST_SIZES:
+            sudoku = Sudoku(box_size=(width, height))
+            size = width * height
+            sudoku.set_at(size + 2, 1)
+            self.assertEqual(sudoku[1, 2], 1)
+            sudoku[2, 1] = 2
+            self.assertEqual(sudoku.get_at(2 * size + 1), 2)
+
+    def test_out_of_range_numbers(self):
+        """Fields can hold numbers outside of the valid range."""
+        sudoku = Sudoku()
+        for value in (-1, 10, 200, 40000):
+            sudoku[0, 0] = value
+            self.assertEqual(sudoku[0, 0], value)
+            self.assertEqual(sudoku.copy()[0, 0], value)
+
+    def test_pickle(self):
+        """A pickled sudoku is restored with numbers and candidates."""
+        sudoku = Sudoku.decode(CANDIDATES_EXAMPLE)
+        restored = pickle.loads(pickle.dumps(sudoku))
+        self.assertTrue(restored.equals(sudoku, candidates=True))
+        self.assertIs(restored.geometry, sudoku.geometry)
+
+    def test_copy(self):
+        """A copy is equal, but independent from the original."""
+        sudoku = Sudoku.decode(CANDIDATES_EXAMPLE)
+        copy = sudoku.copy(include_candidates=True)
+        self.assertTrue(copy.equals(sudoku, candidates=True))
+
+        copy[0, 0] = 4
+        copy.set_candidates(0, 1, {4})
+        self.assertEqual(sudoku[0, 0], 0)
+        self.assertEqual(sudoku.get_candidates(0, 1), {4, 5, 7, 8})
+
+        copy = sudoku.copy()
+        self.assertEqual(copy, sudoku)
+        self.assertEqual(copy.get_candidates(0, 1), set())
+
     def test_iter(self):
         """Iterating through coordinates works."""
         for width, height in (3, 3), (2, 2), (4, 2):
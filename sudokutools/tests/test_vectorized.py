@@ -0,0 +1,110 @@
+from unittest import TestCase, skipIf
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from sudokutools.analyze import find_conflicts, is_solved
+from sudokutools.generate import generate
+from sudokutools.solve import apply_singles, init_candidates
+from sudokutools.sudoku import Sudoku
+
+from sudokutools.tests.constants import SOLVE_EXAMPLES, UNSOLVABLES
+
+if numpy is not None:
+    from sudokutools.vectorized import SudokuBatch
+
+BOX_SIZES = ((2, 2), (2, 3), (3, 2), (3, 3))
+
+
+def examples():
+    sudokus = [Sudoku.decode(example) for example, _ in SOLVE_EXAMPLES]
+    sudokus.extend(Sudoku.decode(example) for example in UNSOLVABLES)
+    for box_size in BOX_SIZES:
+        for _ in range(3):
+            sudokus.append(generate(box_size=box_size))
+    return sudokus
+
+
+@skipIf(numpy is None, "NumPy is not installed")
+class SudokuBatchTests(TestCase):
+    def setUp(self):
+        self.sudokus = examples()
+
+    def batches(self):
+        for box_size in BOX_SIZES:
+            sudokus = [s for s in self.sudokus if s.box_size == box_size]
+            yield sudokus, SudokuBatch.from_sudokus(sudokus)
+
+    def test_round_trip(self):
+        """from_sudokus() and to_sudokus() keep numbers and candidates."""
+        for sudokus, _ in self.batches():
+            for sudoku in sudokus:
+                init_candidates(sudoku)
+            batch = SudokuBatch.from_sudokus(sudokus)
+            self.assertEqual(len(batch), len(sudokus))
+            for sudoku, other in zip(sudokus, batch.to_sudokus()):
+                self.assertTrue(sudoku.equals(other, candidates=True))
+
+    def test_decode_encode(self):
+        """decode() and encode() work like Sudoku.decode() and encode()."""
+        lines = [Sudoku.decode(example).encode()
+                 for example, _ in SOLVE_EXAMPLES[:3]]
+        batch = SudokuBatch.decode(lines)
+        self.assertEqual(
+            batch.encode(), [Sudoku.decode(line).encode() for line in lines])
+        self.assertEqual(
+            SudokuBatch.decode([lines[0].replace("0", ".")]).encode(),
+            [Sudoku.decode(lines[0]).encode()])
+        self.assertRaises(ValueError, SudokuBatch.decode, [lines[0][:-1]])
+        self.assertRaises(ValueError, SudokuBatch.decode, ["x" * 81])
+
+    def test_init_candidates(self):
+        """init_candidates() works like solve.init_candidates()."""
+        for sudokus, batch in self.batches():
+            batch.init_candidates()
+            for sudoku, other in zip(sudokus, batch.to_sudokus()):
+                init_candidates(sudoku)
+                self.assertTrue(sudoku.equals(other, candidates=True))
+
+    def test_find_conflicts(self):
+        """find_conflicts() finds the fields of analyze.find_conflicts()."""
+        sudoku = Sudoku.decode(SOLVE_EXAMPLES[0][0])
+        sudoku[0, 0] = sudoku[0, 2]
+        self.sudokus.append(sudoku)
+
+        for sudokus, batch in self.batches():
+            conflicts = batch.find_conflicts()
+            solved = batch.is_solved()
+            for k, sudoku in enumerate(sudokus):
+                expected = set(f for f, _, _ in find_conflicts(sudoku))
+                found = set(zip(*numpy.nonzero(conflicts[k])))
+                self.assertEqual(found, expected)
+                self.assertEqual(solved[k], is_solved(sudoku))
+
+    def test_apply_singles(self):
+        """apply_singles() works like solve.apply_singles()."""
+        for sudokus, batch in self.batches():
+            ok = batch.apply_singles()
+            for k, sudoku in enumerate(sudokus):
+                self.assertEqual(ok[k], apply_singles(sudoku))
+                if ok[k]:
+                    self.assertEqual(batch[k], sudoku)
+
+    def test_wrong_shape(self):
+        """Arrays, which don't fit to the box size, raise ValueError."""
+        self.assertRaises(ValueError, SudokuBatch, numpy.zeros((1, 9, 9)),
+                          box_size=(2, 2))
+        self.assertRaises(ValueError, SudokuBatch, numpy.zeros((9, 9)))
+
+    def test_too_large(self):
+        """Sudokus with N > 62 raise ValueError (candidates need N bits)."""
+        self.assertRaises(ValueError, SudokuBatch, numpy.zeros((1, 64, 64)),
+                          box_size=(8, 8))
+        self.assertRaises(ValueError, SudokuBatch.from_sudokus,
+                          [Sudoku(box_size=(8, 8))])
+
+        batch = SudokuBatch(numpy.zeros((1, 56, 56)), box_size=(7, 8))
+        batch.init_candidates()
+        self.assertEqual(batch.candidates[0, 0, 0], (2 << 56) - 2)
@@ -0,0 +1,375 @@
+"""Process many sudokus at once using NumPy arrays.
+
+Classes defined here:
+ * SudokuBatch: Many sudokus of the same box size in a single array.
+
+This module requires NumPy, which is an optional dependency of
+sudokutools (install with: pip install sudokutools[numpy]).
+All other modules work without it.
+"""
+
+import numpy as np
+
+from sudokutools.sudoku import Sudoku
+
+# the largest N, for which (2 << N) - 2 (all candidates) fits into int64
+MAX_SIZE = 62
+
+
+class SudokuBatch(object):
+    """Many sudokus of the same box size in a single array.
+
+    Attributes:
+        numbers (numpy.ndarray): The numbers of all sudokus as uint8 array
+                                 of shape (K, N, N) (0 for empty fields).
+        candidates (numpy.ndarray): The candidate bitmasks of all fields
+                                    (see Sudoku.get_candidate_mask()) as
+                                    int64 array of shape (K, N, N).
+        box_size (int, int): The box width and box height of all sudokus.
+
+    The methods work on all sudokus at once and return arrays with one
+    value per sudoku (or field). Changes of the numbers or candidates
+    must be done on the arrays.
+    """
+
+    def __init__(self, numbers, box_size=(3, 3), candidates=None):
+        """Create a batch from an array of numbers.
+
+        Args:
+            numbers (array_like): The numbers of shape (K, N, N).
+            box_size (int, int): The box size of all sudokus.
+            candidates (array_like): The candidate bitmasks of shape
+                                     (K, N, N) or None (no candidates).
+
+        Raises:
+            ValueError: if the shapes don't fit to the box size or N > 62
+                        (the candidates of a field don't fit into int64).
+        """
+        self.box_size = tuple(box_size)
+        self.box_width, self.box_height = self.box_size
+        self.size = size = self.box_width * self.box_height
+        if size > MAX_SIZE:
+            raise ValueError(
+                "SudokuBatch supports N <= %d (N is %d)." % (MAX_SIZE, size))
+
+        self.numbers = np.array(numbers, dtype=np.uint8)
+        if candidates is None:
+            self.candidates = np.zeros(self.numbers.shape, dtype=np.int64)
+        else:
+            self.candidates = np.array(candidates, dtype=np.int64)
+
+        for array in (self.numbers, self.candidates):
+            if array.ndim != 3 or array.shape[1:] != (size, size):
+                raise ValueError(
+                    "Shape must be (K, %d, %d) (%s was given)." % (
+                        size, size, array.shape))
+        if self.numbers.shape != self.candidates.shape:
+            raise ValueError("numbers and candidates differ in shape.")
+
+    @classmethod
+    def from_sudokus(cls, sudokus, box_size=None):
+        """Create a batch from sudokus (including their candidates).
+
+        Args:
+            sudokus (iterable of Sudoku): The sudokus (all of the same size).
+            box_size (int, int): The box size for an empty iterable.
+                                 Defaults to the box size of the first
+                                 sudoku or (3, 3).
+
+        Raises:
+            ValueError: if the box sizes differ, N > 62 or a number is
+                        outside of 0..255.
+        """
+        numbers = []
+        candidates = []
+        for sudoku in sudokus:
+            if box_size is None:
+                box_size = sudoku.box_size
+            elif sudoku.box_size != tuple(box_size):
+                raise ValueError("All sudokus must have the same box size.")
+
+            cells = range(len(sudoku))
+            numbers.append([sudoku.get_at(i) for i in cells])
+            candidates.append([sudoku.get_candidate_mask_at(i) for i in cells])
+
+        if box_size is None:
+            box_size = (3, 3)
+        size = box_size[0] * box_size[1]
+        if size > MAX_SIZE:
+            raise ValueError(
+                "SudokuBatch supports N <= %d (N is %d)." % (MAX_SIZE, size))
+
+        numbers = np.array(numbers, dtype=np.int64).reshape(-1, size, size)
+        if numbers.size and (numbers.min() < 0 or numbers.max() > 255):
+            raise ValueError("Numbers must be in 0..255.")
+        return cls(numbers, box_size,
+                   np.array(candidates, dtype=np.int64).reshape(numbers.shape))
+
+    @classmethod
+    def decode(cls, lines, box_size=(3, 3), empty="0."):
+        """Create a batch from lines with one character per field.
+
+        Args:
+            lines (iterable of str): Sudokus like "003020600900305001..."
+                                     (N * N digits without separators).
+            box_size (int, int): The box size of all sudokus (N <= 9).
+            empty (str): The characters of empty fields.
+
+        Raises:
+            ValueError: if a line has the wrong length or invalid characters.
+        """
+        size = box_size[0] * box_size[1]
+        if size > 9:
+            raise ValueError("decode() only supports sudokus with N <= 9.")
+
+        lines = [line.strip() for line in lines]
+        if any(len(line) != size * size for line in lines):
+            raise ValueError("All lines must have %d fields." % size ** 2)
+
+        data = "".join(lines).encode("ascii", "replace")
+        codes = np.frombuffer(data, dtype=np.uint8).copy()
+
+        for char in empty:
+            codes[codes == ord(char)] = ord("0")
+        codes -= ord("0")
+        if codes.size and codes.max() > size:
+            raise ValueError("Invalid characters in lines.")
+
+        return cls(codes.reshape(-1, size, size), box_size)
+
+    def encode(self):
+        """Return the numbers of each sudoku as line (see decode()).
+
+        Returns:
+            list of str: The encoded sudokus.
+
+        Raises:
+            ValueError: if N > 9.
+        """
+        if self.size > 9:
+            raise ValueError("encode() only supports sudokus with N <= 9.")
+
+        length = self.size ** 2
+        data = (self.numbers + ord("0")).tobytes().decode("ascii")
+        return [data[i:i + length] for i in range(0, len(data), length)]
+
+    def __len__(self):
+        return self.numbers.shape[0]
+
+    def __getitem__(self, k):
+        """Return the sudoku with index k (including its candidates)."""
+        sudoku = Sudoku(box_size=self.box_size)
+        for i, value in enumerate(self.numbers[k].ravel().tolist()):
+            sudoku.set_at(i, value)
+        for i, mask in enumerate(self.candidates[k].ravel().tolist()):
+            sudoku.set_candidate_mask_at(i, mask)
+        return sudoku
+
+    def to_sudokus(self):
+        """Return a list of all sudokus (including their candidates)."""
+        return [self[k] for k in range(len(self))]
+
+    def __boxes(self, array, reduce):
+        """Reduce array (K, N, N) over each box and return (K, N, N)."""
+        width, height = self.box_size
+        # axes: sudoku, band, row in band, stack, column in stack
+        shaped = array.reshape(-1, width, height, height, width)
+        reduced = reduce(reduce(shaped, axis=4), axis=2)
+        shape = (array.shape[0], width, height, height, width)
+        return np.broadcast_to(
+            reduced[:, :, None, :, None], shape).reshape(array.shape)
+
+    def __placed(self, numbers):
+        """Return the bitmasks of the numbers in each row, column and box.
+
+        Returns:
+            (numpy.ndarray, ...): The bitmask of each field and the
+                                  bitmasks of the row, column and box of
+                                  each field (broadcastable to numbers).
+        """
+        bits = np.left_shift(np.int64(1), numbers.astype(np.int64))
+        bits[numbers == 0] = 0
+        rows = np.bitwise_or.reduce(bits, axis=2)[:, :, None]
+        cols = np.bitwise_or.reduce(bits, axis=1)[:, None, :]
+        boxes = self.__boxes(bits, np.bitwise_or.reduce)
+        return bits, rows, cols, boxes
+
+    def __onehot(self, numbers):
+        """Return numbers (K, N, N) as bool array (K, N, N, N).
+
+        The last axis tells for each number 1..N, if it's in the field.
+        """
+        return numbers[..., None] == np.arange(
+            1, self.size + 1, dtype=numbers.dtype)
+
+    def __counts(self, onehot):
+        """Count onehot (K, N, N, N) in the row, column and box of fields.
+
+        Returns:
+            (numpy.ndarray, ...): The counts of each number in the row,
+                                  column and box of each field
+                                  (broadcastable to onehot).
+        """
+        width, height = self.box_size
+        rows = onehot.sum(axis=2, dtype=np.int8)[:, :, None, :]
+        cols = onehot.sum(axis=1, dtype=np.int8)[:, None, :, :]
+
+        # axes: sudoku, band, row in band, stack, column in stack, number
+        shaped = onehot.reshape(-1, width, height, height, width, self.size)
+        boxes = shaped.sum(axis=(2, 4), dtype=np.int8)
+        boxes = np.broadcast_to(
+            boxes[:, :, None, :, None, :], shaped.shape).reshape(onehot.shape)
+        return rows, cols, boxes
+
+    def __conflicts(self, numbers):
+        """Return which fields in numbers have a conflict (K, N, N)."""
+        onehot = self.__onehot(numbers)
+        rows, cols, boxes = self.__counts(onehot)
+        return (onehot & ((rows > 1) | (cols > 1) | (boxes > 1))).any(axis=3)
+
+    def __houses(self, masks, rows, cols, boxes):
+        """Yield the masks of each house type for apply_singles().
+
+        Yields:
+            (numpy.ndarray, numpy.ndarray, callable): The masks of shape
+                (K, houses, fields), the numbers placed in each house
+                (K, houses) and a function, which expands an array of
+                shape (K, houses) to the fields (K, N, N).
+        """
+        width, height = self.box_size
+        size = self.size
+        shape = masks.shape
+
+        yield masks, rows[:, :, 0], lambda a: a[:, :, None]
+        yield masks.transpose(0, 2, 1), cols[:, 0, :], lambda a: a[:, None, :]
+
+        # axes: sudoku, band, row in band, stack, column in stack
+        box_masks = masks.reshape(-1, width, height, height, width)
+        box_masks = box_masks.transpose(0, 1, 3, 2, 4).reshape(
+            -1, size, size)
+        placed = boxes.reshape(-1, width, height, height, width)[:, :, 0, :, 0]
+
+        def expand(a):
+            a = a.reshape(-1, width, height)[:, :, None, :, None]
+            return np.broadcast_to(
+                a, (shape[0], width, height, height, width)).reshape(shape)
+
+        yield box_masks, placed.reshape(-1, size), expand
+
+    def __duplicates(self, numbers):
+        """Return which sudokus have a number twice in a house (K,)."""
+        bits = np.left_shift(np.int64(1), numbers.astype(np.int64))
+        bits[numbers == 0] = 0
+        width, height = self.box_size
+
+        # without duplicates the sum of the bits is equal to their union
+        boxes = bits.reshape(-1, width, height, height, width)
+        duplicates = np.zeros(numbers.shape[0], dtype=bool)
+        for array, axes in ((bits, (2,)), (bits, (1,)), (boxes, (2, 4))):
+            union = array
+            for axis in sorted(axes, reverse=True):
+                union = np.bitwise_or.reduce(union, axis=axis)
+            total = array.sum(axis=axes)
+            duplicates |= (total != union).reshape(len(duplicates), -1).any(
+                axis=1)
+        return duplicates
+
+    def init_candidates(self, filled_only=False):
+        """Calculate and set the candidates of all sudokus.
+
+        Works like solve.init_candidates() for each sudoku.
+
+        Args:
+            filled_only (bool): Only set the candidates of filled fields
+                                (to their number). Empty fields get no
+                                candidates.
+        """
+        bits, rows, cols, boxes = self.__placed(self.numbers)
+        placed = rows | cols | boxes
+        all_mask = (2 << self.size) - 2
+        empty = self.numbers == 0
+
+        if filled_only:
+            self.candidates[...] = np.where(empty, 0, bits)
+        else:
+            self.candidates[...] = np.where(empty, all_mask & ~placed, bits)
+
+    def find_conflicts(self):
+        """Return which fields have a number, which is also in a peer.
+
+        Returns:
+            numpy.ndarray: bool array of shape (K, N, N).
+        """
+        return self.__conflicts(self.numbers)
+
+    def is_solved(self):
+        """Return which sudokus are completely filled without conflicts.
+
+        Returns:
+            numpy.ndarray: bool array of shape (K,).
+        """
+        valid = (self.numbers > 0) & (self.numbers <= self.size)
+        return valid.all(axis=(1, 2)) & ~self.find_conflicts().any(axis=(1, 2))
+
+    def apply_singles(self):
+        """Set naked and hidden singles in all sudokus (works _in_place_).
+
+        Works like solve.apply_singles() for each sudoku: Candidates are
+        calculated from the numbers and the stored candidates are neither
+        used nor changed. Sudokus with a contradiction are not changed
+        any further.
+
+        Returns:
+            numpy.ndarray: bool array of shape (K,), which is False for
+                           the sudokus with a contradiction (conflicting
+                           or invalid numbers, a field without candidates
+                           or a number without a field in a house).
+        """
+        size = self.size
+        all_mask = (2 << size) - 2
+        numbers = self.numbers
+        ok = (numbers <= size).all(axis=(1, 2))
+        ok[ok] = ~self.__duplicates(numbers[ok])
+        active = ok.copy()
+
+        while active.any():
+            indices = np.flatnonzero(active)
+            current = numbers[indices]
+            empty = current == 0
+
+            bits, rows, cols, boxes = self.__placed(current)
+            masks = np.where(empty, all_mask & ~(rows | cols | boxes), 0)
+            # a field without candidates
+            valid = ~(empty & (masks == 0)).any(axis=(1, 2))
+
+            singles = np.where(masks & (masks - 1) == 0, masks, 0)
+            for house_masks, placed, expand in self.__houses(
+                    masks, rows, cols, boxes):
+                once = np.zeros(house_masks.shape[:2], dtype=np.int64)
+                twice = np.zeros(house_masks.shape[:2], dtype=np.int64)
+                for j in range(size):
+                    twice |= once & house_masks[:, :, j]
+                    once |= house_masks[:, :, j]
+
+                # a number without a field in a house
+                valid &= ((once | placed) == all_mask).all(axis=1)
+                singles |= masks & expand(once & ~twice)
+
+            # a field, which is the only one for two numbers
+            valid &= ~(singles & (singles - 1) != 0).any(axis=(1, 2))
+
+            found = singles != 0
+            changed = valid & found.any(axis=(1, 2))
+            current = np.where(
+                changed[:, None, None] & found,
+                np.log2(np.maximum(singles, 1)).round(), current)
+            current = current.astype(np.uint8)
+
+            # conflicting singles set at the same time
+            valid &= ~self.__duplicates(current)
+            numbers[indices[valid]] = current[valid]
+
+            ok[indices[~valid]] = False
+            active[indices[~(valid & changed)]] = False
+
+        return ok